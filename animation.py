@@ -0,0 +1,93 @@
+import time
+
+# Ordonnanceur d'affichage pour les résolutions pas à pas : le solveur avance à sa propre vitesse
+# et la grille n'est redessinée qu'à une fréquence fixe. Tous les pas faits depuis la dernière
+# image sont regroupés en une seule mise à jour (grille, compteurs, pas par seconde).
+
+DEFAULT_FPS = 30
+
+class FrameScheduler:
+    """
+    À appeler à chaque pas du solveur (placement ou retour en arrière) avec step().
+    Le délai par pas suit le curseur de vitesse de la fenêtre (valeur / `delay_divisor` secondes ;
+    par défaut l'attribut `delay_divisor` de la fenêtre, sinon 1000),
+    sauf si la case « Vitesse maximale » est cochée. Le délai est cumulé au lieu d'être dormi
+    à chaque pas : on ne dort que lorsque le solveur est en avance sur le rythme demandé.
+    Le temps de dessin ne dépasse pas la moitié du temps total si une image coûte plus
+    d'une période.
+    `board` est la grille à dessiner, ou une fonction sans argument qui la renvoie : un solveur
+    qui remplace sa grille (retour en arrière via l'historique) passe `lambda: self.board`.
+    """
+    def __init__(self, viewer, board, fps=DEFAULT_FPS, delay_divisor=None):
+        self.viewer = viewer
+        self.board_source = board if callable(board) else (lambda: board)
+        self.frame_period = 1 / fps
+        self.delay_divisor = delay_divisor or getattr(viewer, "delay_divisor", 1000)
+        self.steps = 0
+        self.attempts = 0
+        self.backtracks = 0
+        self.last_cell = None
+        self.last_color = "blue"
+
+        self.start_time = time.perf_counter()
+        self.next_frame = self.start_time
+        self.step_delay = self._read_delay()
+        self.pace_time = self.start_time
+
+    def _read_delay(self):
+        max_speed_var = getattr(self.viewer, "max_speed_var", None)
+        if max_speed_var is not None and max_speed_var.get():
+            return 0.0
+        return self.viewer.speed_scale.get() / self.delay_divisor
+
+    def step(self, row, col, color="blue", attempts=None, backtracks=None):
+        """Enregistre un pas ; redessine seulement si une image est due (ou en pause / pas à pas)."""
+        self.steps += 1
+        self.last_cell = (row, col)
+        self.last_color = color
+        if attempts is not None:
+            self.attempts = attempts
+        if backtracks is not None:
+            self.backtracks = backtracks
+
+        now = time.perf_counter()
+        if self.step_delay:
+            self.pace_time = max(self.pace_time + self.step_delay, now - self.frame_period)
+            if self.pace_time - now > 0.001:
+                time.sleep(self.pace_time - now)
+                now = time.perf_counter()
+
+        if now >= self.next_frame or self.viewer.paused or self.viewer.step_forward:
+            self.render()
+            while self.viewer.paused and not self.viewer.step_forward:
+                self.viewer.root.update()
+                time.sleep(0.1)
+            self.pace_time = time.perf_counter()
+
+    def steps_per_second(self):
+        elapsed = time.perf_counter() - self.start_time
+        return self.steps / elapsed if elapsed > 0 else 0.0
+
+    def render(self):
+        """Dessine l'état courant et traite les événements Tk (boutons, curseur)."""
+        frame_start = time.perf_counter()
+        viewer = self.viewer
+        board = self.board_source()
+        if self.last_cell is not None:
+            viewer.update_grid(board, *self.last_cell, color=self.last_color)
+        else:
+            viewer.update_grid(board)
+        viewer.update_attempt_counter(self.attempts)
+        viewer.update_backtrack_counter(self.backtracks)
+        steps_label = getattr(viewer, "steps_per_second_label", None)
+        if steps_label is not None:
+            steps_label.config(text=f"Pas/s : {self.steps_per_second():.0f}")
+        viewer.root.update()
+
+        self.step_delay = self._read_delay()
+        now = time.perf_counter()
+        self.next_frame = now + max(self.frame_period, now - frame_start)
+
+    def finish(self):
+        """Dernière image, pour que l'affichage corresponde à l'état final."""
+        self.render()
@@ -0,0 +1,126 @@
+import time
+from contextlib import nullcontext
+
+from main import ENGINES, string_to_matrix
+from profil_memoire import MemoryProfile
+
+# Budget de résolution : délai maximal, nombre maximal de nœuds et jeton d'annulation.
+# Les moteurs appellent budget.tick() une fois par nœud ; le test coûteux (horloge,
+# jeton) n'est fait que tous les `check_interval` nœuds.
+
+class BudgetExceeded(Exception):
+    """Levée dans la recherche quand le budget est épuisé ou que la résolution est annulée."""
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason  # "timeout", "node_limit" ou "cancelled"
+
+class CancellationToken:
+    """Jeton partagé avec l'appelant pour interrompre une résolution en cours."""
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class SolveBudget:
+    """Limite de temps (secondes) et/ou de nœuds pour une résolution."""
+    __slots__ = ("deadline", "max_nodes", "token", "check_interval", "nodes", "next_check", "start_time")
+
+    def __init__(self, time_limit=None, max_nodes=None, token=None, check_interval=256):
+        self.start_time = time.perf_counter()
+        self.deadline = None if time_limit is None else self.start_time + time_limit
+        self.max_nodes = max_nodes
+        self.token = token
+        self.check_interval = check_interval
+        self.nodes = 0
+        self.next_check = 1  # Premier nœud : vérification immédiate (jeton déjà annulé, délai nul)
+
+    def tick(self):
+        """Compte un nœud ; ne fait la vérification complète que de temps en temps."""
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.check()
+
+    def check(self):
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise BudgetExceeded("node_limit")
+        if self.token is not None and self.token.cancelled:
+            raise BudgetExceeded("cancelled")
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise BudgetExceeded("timeout")
+
+        self.next_check = self.nodes + self.check_interval
+        if self.max_nodes is not None:
+            self.next_check = min(self.next_check, self.max_nodes + 1)
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+def solve_with_budget(board, engine="mrv", time_limit=None, max_nodes=None, token=None, profile_memory=False,
+                      tracer=None, nogoods=None):
+    """
+    Résout la grille avec un budget et renvoie un résultat structuré au lieu de bloquer :
+    {"status": "solved" | "unsolvable" | "timeout" | "node_limit" | "cancelled",
+     "engine", "nodes", "time", "partial"}.
+    En cas d'interruption, la grille est remise dans son état initial et l'état atteint
+    par la recherche est renvoyé dans "partial".
+    Avec profile_memory=True, le résultat contient aussi "memory" (voir MemoryProfile.report) ;
+    le temps mesuré est alors plus élevé à cause de tracemalloc.
+    `tracer` (TraceWriter, optionnel) enregistre la trace de recherche.
+    `nogoods` (NogoodTable, moteur "mrv" uniquement) peut être partagée entre plusieurs appels :
+    les sous-arbres prouvés sans solution lors d'un essai interrompu ne sont pas réexplorés.
+    """
+    solver = ENGINES[engine]
+    options = {}
+    if nogoods is not None and engine == "mrv":
+        nogoods.start(board)
+        options["nogoods"] = nogoods
+    initial_board = board.copy()
+
+    partial = None
+    with (MemoryProfile() if profile_memory else nullcontext()) as profile:
+        budget = SolveBudget(time_limit, max_nodes, token)
+        try:
+            status = "solved" if solver(board, budget=budget, tracer=tracer, **options) else "unsolvable"
+        except BudgetExceeded as exc:
+            status = exc.reason
+            partial = board.copy()
+            board[:] = initial_board[:]
+        elapsed = budget.elapsed()
+
+    result = {
+        "status": status,
+        "engine": engine,
+        "nodes": budget.nodes,
+        "time": elapsed,
+        "partial": partial,
+    }
+    if profile is not None:
+        result["memory"] = profile.report()
+    return result
+
+def solve_batch(sudoku_strings, engine="mrv", time_limit=None, max_nodes=None,
+                fallback=None, fallback_time_limit=None, token=None):
+    """
+    Résout un lot de grilles avec un budget par grille. Les grilles interrompues
+    (timeout ou limite de nœuds) sont relancées avec le moteur `fallback` et son propre
+    délai. Renvoie une liste de (grille résolue ou None, résultat).
+    """
+    results = []
+    for sudoku_string in sudoku_strings:
+        board = string_to_matrix(sudoku_string)
+        result = solve_with_budget(board, engine, time_limit, max_nodes, token)
+
+        if result["status"] in ("timeout", "node_limit") and fallback is not None:
+            first_try = result
+            result = solve_with_budget(board, fallback, fallback_time_limit, None, token)
+            result["fallback_from"] = first_try
+
+        if result["status"] == "cancelled":
+            results.append((None, result))
+            break
+        results.append((board if result["status"] == "solved" else None, result))
+
+    return results
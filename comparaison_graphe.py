@@ -0,0 +1,199 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+# Rapport de comparaison des moteurs à partir de mesures déjà enregistrées
+# (fichiers JSON écrits par garde_performance.py), sans rien résoudre à nouveau.
+# Tout est calculé sur des tableaux NumPy par colonne (un tableau par mesure et par moteur),
+# ce qui permet de traiter des millions de résultats.
+
+MAX_PLOT_POINTS = 5000  # Au-delà, les graphiques utilisent des quantiles ou un hexbin
+
+def load_results(paths):
+    """
+    Charge un ou plusieurs fichiers de mesures. Renvoie {moteur: colonnes} où les colonnes sont
+    "nodes" (int64), "times" (float64), "level" (codes int) et "puzzle_ids" (int64, pour apparier
+    les moteurs), ainsi que la liste des noms de niveaux.
+    """
+    reports = []
+    for path in paths:
+        with open(path) as f:
+            reports.append(json.load(f))
+
+    # Codes des niveaux et identifiants de grilles communs à tous les fichiers (np.unique vectorisé)
+    all_levels = np.concatenate([np.asarray(report.get("levels") or ["?"] * len(report["puzzles"])) for report in reports])
+    all_puzzles = np.concatenate([np.asarray(report["puzzles"]) for report in reports])
+    level_names, all_level_codes = np.unique(all_levels, return_inverse=True)
+    _, all_puzzle_ids = np.unique(all_puzzles, return_inverse=True)
+
+    engines = {}
+    start = 0
+    for report in reports:
+        stop = start + len(report["puzzles"])
+        level_codes = all_level_codes[start:stop].astype(np.int64)
+        ids = all_puzzle_ids[start:stop].astype(np.int64)
+        start = stop
+
+        for engine, measures in report["engines"].items():
+            columns = {
+                "nodes": np.asarray(measures["nodes"], dtype=np.int64),
+                "times": np.asarray(measures["times"], dtype=np.float64),
+                "level": level_codes,
+                "puzzle_ids": ids,
+            }
+            if engine in engines:
+                columns = {key: np.concatenate((engines[engine][key], value)) for key, value in columns.items()}
+            engines[engine] = columns
+
+    return engines, [str(name) for name in level_names]
+
+def aggregate(engines, level_names):
+    """Statistiques par moteur et par niveau (plus une ligne « tous ») : liste de dictionnaires."""
+    rows = []
+    for engine, columns in engines.items():
+        groups = [(name, columns["level"] == code) for code, name in enumerate(level_names)]
+        groups.append(("tous", np.ones_like(columns["level"], dtype=bool)))
+        for name, mask in groups:
+            times = columns["times"][mask]
+            if times.size == 0:
+                continue
+            nodes = columns["nodes"][mask]
+            p50, p90, p99 = np.percentile(times, (50, 90, 99))
+            rows.append({
+                "engine": engine,
+                "level": name,
+                "count": int(times.size),
+                "mean_nodes": float(nodes.mean()),
+                "p50": float(p50),
+                "p90": float(p90),
+                "p99": float(p99),
+                "throughput": float(times.size / times.sum()),
+                "us_per_node": float(1e6 * times.sum() / max(int(nodes.sum()), 1)),
+            })
+    return rows
+
+def speedups(engines, level_names, reference):
+    """
+    Accélération de chaque moteur par rapport à `reference`, par niveau : moyenne géométrique
+    des rapports de temps sur les grilles communes aux deux moteurs.
+    """
+    ref = engines[reference]
+    # Appariement par identifiant de grille (tableau trié + searchsorted)
+    order = np.argsort(ref["puzzle_ids"], kind="stable")
+    sorted_ids = ref["puzzle_ids"][order]
+    sorted_times = ref["times"][order]
+
+    table = {}
+    for engine, columns in engines.items():
+        if engine == reference:
+            continue
+        positions = np.clip(np.searchsorted(sorted_ids, columns["puzzle_ids"]), 0, len(sorted_ids) - 1)
+        common = sorted_ids[positions] == columns["puzzle_ids"]
+        ref_times = sorted_times[positions[common]]
+        ratios = np.log(ref_times / columns["times"][common])
+        levels = columns["level"][common]
+
+        table[engine] = {}
+        for code, name in enumerate(level_names):
+            mask = levels == code
+            if mask.any():
+                table[engine][name] = float(np.exp(ratios[mask].mean()))
+        if ratios.size:
+            table[engine]["tous"] = float(np.exp(ratios.mean()))
+    return table
+
+def print_report(rows, speedup_table, reference):
+    print(f"{'moteur':12s} {'niveau':10s} {'grilles':>8s} {'nœuds moy.':>11s} {'p50 (ms)':>9s} "
+          f"{'p90 (ms)':>9s} {'p99 (ms)':>9s} {'grilles/s':>10s} {'µs/nœud':>8s}")
+    for row in rows:
+        print(f"{row['engine']:12s} {row['level']:10s} {row['count']:8d} {row['mean_nodes']:11.1f} "
+              f"{row['p50'] * 1000:9.2f} {row['p90'] * 1000:9.2f} {row['p99'] * 1000:9.2f} "
+              f"{row['throughput']:10.1f} {row['us_per_node']:8.1f}")
+
+    if speedup_table:
+        print(f"\nAccélération par rapport à {reference} (moyenne géométrique, >1 = plus rapide)")
+        for engine, by_level in speedup_table.items():
+            print(f"  {engine:12s} " + "  ".join(f"{level} x{value:.2f}" for level, value in by_level.items()))
+
+def _cdf_points(times):
+    """Points de la CDF, réduits à MAX_PLOT_POINTS quantiles pour les grands tableaux."""
+    if times.size <= MAX_PLOT_POINTS:
+        values = np.sort(times)
+        return values, np.arange(1, values.size + 1) / values.size
+    probabilities = np.linspace(0, 1, MAX_PLOT_POINTS)
+    return np.quantile(times, probabilities), probabilities
+
+def plot_report(engines, speedup_table, reference, output=None):
+    fig, (ax_nodes, ax_cdf, ax_speedup) = plt.subplots(1, 3, figsize=(18, 6))
+
+    # Nœuds en fonction du temps
+    for engine, columns in engines.items():
+        if columns["times"].size > MAX_PLOT_POINTS:
+            ax_nodes.hexbin(columns["nodes"], columns["times"], xscale="log", yscale="log", gridsize=60, mincnt=1, alpha=0.5)
+            ax_nodes.plot([], [], label=engine)
+        else:
+            ax_nodes.scatter(columns["nodes"], columns["times"], s=10, label=engine)
+    ax_nodes.set_xscale("log")
+    ax_nodes.set_yscale("log")
+    ax_nodes.set_title("Nœuds en fonction du temps")
+    ax_nodes.set_xlabel("Nœuds explorés")
+    ax_nodes.set_ylabel("Temps d'exécution (secondes)")
+    ax_nodes.legend()
+
+    # Distribution des latences
+    for engine, columns in engines.items():
+        values, probabilities = _cdf_points(columns["times"])
+        ax_cdf.step(values, probabilities, where="post", label=engine)
+    ax_cdf.set_xscale("log")
+    ax_cdf.set_title("CDF des temps de résolution")
+    ax_cdf.set_xlabel("Temps d'exécution (secondes)")
+    ax_cdf.set_ylabel("Proportion des grilles")
+    ax_cdf.legend()
+
+    # Accélérations par niveau
+    if speedup_table:
+        levels = list(next(iter(speedup_table.values())))
+        width = 0.8 / len(speedup_table)
+        positions = np.arange(len(levels))
+        for i, (engine, by_level) in enumerate(speedup_table.items()):
+            ax_speedup.bar(positions + i * width, [by_level.get(level, np.nan) for level in levels], width, label=engine)
+        ax_speedup.set_xticks(positions + width * (len(speedup_table) - 1) / 2)
+        ax_speedup.set_xticklabels(levels)
+        ax_speedup.axhline(1, color='black', lw=0.5)
+        ax_speedup.legend()
+    ax_speedup.set_title(f"Accélération par rapport à {reference}")
+
+    plt.tight_layout()
+    if output:
+        plt.savefig(output)
+    else:
+        plt.show()
+    plt.close(fig)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare les moteurs à partir de mesures enregistrées.")
+    parser.add_argument("results", nargs="+", help="fichiers JSON de garde_performance.py")
+    parser.add_argument("--reference", help="moteur de référence pour les accélérations (par défaut le premier)")
+    parser.add_argument("--output", help="enregistre les graphiques dans ce fichier au lieu de les afficher")
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args(argv)
+
+    engines, level_names = load_results(args.results)
+    if not engines:
+        print("Aucune mesure dans les fichiers donnés")
+        return 1
+    reference = args.reference or next(iter(engines))
+
+    rows = aggregate(engines, level_names)
+    speedup_table = speedups(engines, level_names, reference)
+    print_report(rows, speedup_table, reference)
+
+    if not args.no_plot:
+        plot_report(engines, speedup_table, reference, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,18 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import time
+import hashlib
+import inspect
+from contextlib import nullcontext
+
+from graphe_contraintes import PEER_MATRIX
+from profil_memoire import MemoryProfile
+from stockage_resultats import ResultStore
 
 # Variables globales pour évaluer les performances
 iterations = 0  # Compteur pour le nombre d'itérations (placements)
 execution_times = []  # Liste pour stocker les temps d'exécution pour chaque grille
+PROFILE_MEMORY = False  # Pic mémoire par grille avec tracemalloc (ralentit les mesures de temps)
 
 # Ton algorithme de résolution de Sudoku avec évaluation des performances
 def get_valid_numbers(board, row, col):
@@ -18,15 +26,9 @@ def get_valid_numbers(board, row, col):
 
     possible_numbers = set(range(1, 10))
 
-    # Supprime les numéros déjà présents dans la ligne
-    possible_numbers -= set(board[row, :])
-
-    # Supprime les numéros déjà présents dans la colonne
-    possible_numbers -= set(board[:, col])
-
-    # Supprime les numéros déjà présents dans la sous-grille 3x3
-    start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-    possible_numbers -= set(board[start_row:start_row + 3, start_col:start_col + 3].flatten())
+    # Supprime les numéros déjà présents chez les 20 voisins (ligne, colonne et sous-grille 3x3),
+    # lus en une seule fois grâce au graphe de contraintes
+    possible_numbers -= set(board.ravel()[PEER_MATRIX[9 * row + col]].tolist())
 
     return possible_numbers
 
@@ -84,23 +86,27 @@ def string_to_matrix(sudoku_string):
     return np.array([int(char) if char != '.' else 0 for char in sudoku_string]).reshape(9, 9)
 
 # Fonction pour évaluer la performance et générer le graphe
-def evaluate_performance(sudoku_string):
+def evaluate_performance(sudoku_string, profile_memory=False):
     global iterations
     iterations = 0  # Réinitialiser le compteur d'itérations
     
     # Convertir la grille en matrice NumPy
     sudoku_matrix = string_to_matrix(sudoku_string)
 
+    memory_profile = MemoryProfile() if profile_memory else nullcontext()
+
     # Mesurer le temps d'exécution
     start_time = time.time()
     
     # Appeler l'algorithme de résolution
-    if solve_sudoku(sudoku_matrix):
-        pass  # Résolu avec succès
+    with memory_profile:
+        if solve_sudoku(sudoku_matrix):
+            pass  # Résolu avec succès
     end_time = time.time()
     execution_time = end_time - start_time
-    
-    return iterations, execution_time
+
+    peak_bytes = memory_profile.peak_bytes if profile_memory else None
+    return iterations, execution_time, peak_bytes
 
 # Charger les grilles depuis le fichier CSV (par exemple, les grilles difficiles)
 sudoku_df = pd.read_csv('grilles_difficile_sans_rep.csv')
@@ -111,12 +117,43 @@ grids_to_test = sudoku_df['puzzle'].iloc[:num_grids]  # Tester les N premières
 
 iterations_list = []
 times_list = []
+memory_peaks = []
+
+# Les grilles déjà évaluées lors d'une exécution précédente sont relues depuis le stockage.
+# Ce script a son propre solveur (il ne suit pas main.ENGINE_VERSION) : les résultats sont rangés
+# sous une empreinte de son code, et toute modification du solveur invalide les anciens temps.
+SOLVER_SOURCE = "".join(inspect.getsource(f) for f in (get_valid_numbers, find_most_constrained_location, solve_sudoku))
+CACHE_ENGINE = "evaluation-" + hashlib.sha1(SOLVER_SOURCE.encode()).hexdigest()[:12]
+
+store = ResultStore()
+cached = store.get_many(grids_to_test, engine=CACHE_ENGINE)
+new_records = []
 
 # Test des grilles de Sudoku
 for sudoku_string in grids_to_test:
-    iter_count, exec_time = evaluate_performance(sudoku_string)
+    # Un temps mesuré sous tracemalloc est bien plus long : il est gardé à part ("profiled_time")
+    # et n'est jamais relu comme un temps normal ("time")
+    stats = cached.get(sudoku_string, {}).get("stats") or {}
+    time_key = "profiled_time" if PROFILE_MEMORY else "time"
+    if stats.get(time_key) is not None:
+        iter_count, exec_time, peak_bytes = stats["iterations"], stats[time_key], stats.get("peak_bytes")
+    else:
+        iter_count, exec_time, peak_bytes = evaluate_performance(sudoku_string, PROFILE_MEMORY)
+        stats = dict(stats, iterations=iter_count)
+        stats[time_key] = exec_time
+        if PROFILE_MEMORY:
+            stats["peak_bytes"] = peak_bytes
+        new_records.append((sudoku_string, None, stats))
     iterations_list.append(iter_count)
     times_list.append(exec_time)
+    memory_peaks.append(peak_bytes)
+
+store.put_many(new_records, engine=CACHE_ENGINE)
+store.close()
+
+if PROFILE_MEMORY:
+    peaks_kb = np.array(memory_peaks, dtype=float) / 1024
+    print(f"Mémoire allouée par résolution (tracemalloc) : pic moyen {peaks_kb.mean():.1f} KB, pic max {peaks_kb.max():.1f} KB")
 
 # Visualisation des performances avec Matplotlib
 plt.figure(figsize=(14, 6))
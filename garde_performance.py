@@ -0,0 +1,202 @@
+import argparse
+import json
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from budget import solve_with_budget
+from main import ENGINE_VERSION, ENGINES, string_to_matrix
+
+# Garde-fou contre les régressions de performance : un échantillon fixe (graine) de grilles
+# est résolu par chaque moteur, puis comparé à une référence enregistrée.
+#   python garde_performance.py --update   # enregistre la référence
+#   python garde_performance.py            # compare, code de sortie 1 en cas de régression
+
+DEFAULT_BASELINE = 'baseline_performance.json'
+DEFAULT_DATASETS = ['grilles_facile_sans_rep.csv', 'grilles_moyen_sans_rep.csv', 'grilles_difficile_sans_rep.csv']
+PERCENTILES = (50, 90, 99)
+Z_95 = 1.96
+BOOTSTRAP_SAMPLES = 2000
+
+def dataset_level(path):
+    """Niveau de difficulté d'après le nom du fichier (grilles_difficile_sans_rep.csv -> difficile)."""
+    name = os.path.basename(path)
+    return name.split('_')[1] if name.startswith('grilles_') else name
+
+def load_sample(datasets, sample_size, seed):
+    """
+    Même échantillon à chaque exécution : `sample_size` grilles par fichier, tirées avec la graine.
+    Renvoie les grilles et le niveau de chacune.
+    """
+    puzzles = []
+    levels = []
+    for path in datasets:
+        sudoku_df = pd.read_csv(path, dtype=str)
+        count = min(sample_size, len(sudoku_df))
+        puzzles.extend(sudoku_df['puzzle'].sample(n=count, random_state=seed))
+        levels.extend([dataset_level(path)] * count)
+    return puzzles, levels
+
+def run_engine(engine, puzzles, repeats):
+    """Résout l'échantillon ; le temps retenu par grille est la médiane des répétitions."""
+    nodes = []
+    times = []
+    for sudoku_string in puzzles:
+        samples = []
+        for _ in range(repeats):
+            result = solve_with_budget(string_to_matrix(sudoku_string), engine)
+            samples.append(result["time"])
+        nodes.append(result["nodes"])
+        times.append(float(np.median(samples)))
+
+    times_array = np.array(times)
+    return {
+        "nodes": nodes,
+        "times": times,
+        "percentiles": {str(p): float(np.percentile(times_array, p)) for p in PERCENTILES},
+        "throughput": len(puzzles) / float(times_array.sum()),
+    }
+
+def tolerance_thresholds(tolerance, percentile_tolerance=None, throughput_tolerance=None):
+    """Seuils de ralentissement tolérés par mesure (temps par grille, chaque percentile, débit)."""
+    thresholds = {"time": tolerance, "throughput": tolerance if throughput_tolerance is None else throughput_tolerance}
+    for p in PERCENTILES:
+        thresholds[f"p{p}"] = tolerance if percentile_tolerance is None else percentile_tolerance
+    return thresholds
+
+def _bootstrap_ratio_ci(old_times, new_times, statistic, seed=0):
+    """
+    IC à 95 % du rapport statistic(nouveaux temps) / statistic(anciens temps), par bootstrap
+    apparié sur les grilles. `statistic` reçoit un tableau (tirages, grilles) et réduit l'axe 1.
+    """
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, len(old_times), size=(BOOTSTRAP_SAMPLES, len(old_times)))
+    ratios = statistic(new_times[indices]) / statistic(old_times[indices])
+    low, high = np.percentile(ratios, (2.5, 97.5))
+    return float(low), float(high)
+
+def compare_engine(name, baseline, current, tolerances):
+    """
+    Renvoie (régression ?, lignes du rapport) pour un moteur. `tolerances` vient de
+    tolerance_thresholds ; la moindre mesure au-delà de son seuil est une régression.
+    """
+    lines = [f"== {name} =="]
+    regression = False
+
+    # Les nœuds sont déterministes : toute différence est signalée
+    changed = [i for i, (old, new) in enumerate(zip(baseline["nodes"], current["nodes"])) if old != new]
+    if changed:
+        regression = True
+        lines.append(f"  nœuds : {len(changed)} grille(s) différente(s)")
+        for i in changed[:10]:
+            lines.append(f"    grille {i} : {baseline['nodes'][i]} -> {current['nodes'][i]}")
+    else:
+        lines.append(f"  nœuds : identiques ({sum(current['nodes'])} au total)")
+
+    # Temps : test apparié sur le log du rapport par grille (moyenne géométrique et IC à 95 %)
+    log_ratios = np.log(np.array(current["times"]) / np.array(baseline["times"]))
+    mean = float(log_ratios.mean())
+    margin = Z_95 * float(log_ratios.std(ddof=1)) / math.sqrt(len(log_ratios)) if len(log_ratios) > 1 else 0.0
+    low, high = math.exp(mean - margin), math.exp(mean + margin)
+    slower = low > 1 + tolerances["time"]
+    regression |= slower
+    lines.append(f"  temps par grille : x{math.exp(mean):.2f} (IC 95 % : x{low:.2f} - x{high:.2f})"
+                 + ("  <-- RÉGRESSION" if slower else ""))
+
+    # Percentiles et débit : chacun son seuil, avec un IC à 95 % par bootstrap apparié
+    old_times = np.array(baseline["times"])
+    new_times = np.array(current["times"])
+    for p in PERCENTILES:
+        old, new = baseline["percentiles"][str(p)], current["percentiles"][str(p)]
+        low, high = _bootstrap_ratio_ci(old_times, new_times, lambda times: np.percentile(times, p, axis=1))
+        breach = low > 1 + tolerances[f"p{p}"]
+        regression |= breach
+        lines.append(f"  p{p} : {old * 1000:.2f} ms -> {new * 1000:.2f} ms (IC 95 % : x{low:.2f} - x{high:.2f})"
+                     + ("  <-- RÉGRESSION" if breach else ""))
+
+    # Débit = grilles / temps total : une baisse du débit est une hausse du temps total
+    old, new = baseline["throughput"], current["throughput"]
+    low, high = _bootstrap_ratio_ci(old_times, new_times, lambda times: times.sum(axis=1))
+    breach = low > 1 + tolerances["throughput"]
+    regression |= breach
+    lines.append(f"  débit : {old:.1f} -> {new:.1f} grilles/s (temps total IC 95 % : x{low:.2f} - x{high:.2f})"
+                 + ("  <-- RÉGRESSION" if breach else ""))
+
+    return regression, lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare les performances des moteurs à une référence enregistrée.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--datasets", nargs="+", default=DEFAULT_DATASETS)
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES))
+    parser.add_argument("--sample-size", type=int, default=20, help="grilles par fichier")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="ralentissement toléré (0.25 = +25 %%)")
+    parser.add_argument("--percentile-tolerance", type=float,
+                        help="ralentissement toléré sur p50/p90/p99 (par défaut --tolerance)")
+    parser.add_argument("--throughput-tolerance", type=float,
+                        help="baisse de débit tolérée, en hausse du temps total (par défaut --tolerance)")
+    parser.add_argument("--update", action="store_true", help="enregistre la référence au lieu de comparer")
+    parser.add_argument("--save-results", metavar="PATH", help="enregistre aussi les mesures de cette exécution (même format)")
+    args = parser.parse_args(argv)
+
+    if not args.update and not os.path.exists(args.baseline):
+        print(f"Référence {args.baseline} introuvable : lancer d'abord avec --update")
+        return 2
+
+    baseline = None
+    if not args.update:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # On rejoue exactement l'échantillon de la référence
+        args.seed = baseline["seed"]
+        args.sample_size = baseline["sample_size"]
+        args.datasets = baseline["datasets"]
+
+    puzzles, levels = load_sample(args.datasets, args.sample_size, args.seed)
+    results = {engine: run_engine(engine, puzzles, args.repeats) for engine in args.engines}
+
+    report = {
+        "seed": args.seed,
+        "sample_size": args.sample_size,
+        "datasets": args.datasets,
+        "engine_version": ENGINE_VERSION,
+        "puzzles": puzzles,
+        "levels": levels,
+        "engines": results,
+    }
+    if args.save_results:
+        with open(args.save_results, "w") as f:
+            json.dump(report, f)
+
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"Référence enregistrée dans {args.baseline} ({len(puzzles)} grilles)")
+        return 0
+
+    if baseline["puzzles"] != puzzles:
+        print("L'échantillon ne correspond plus à la référence (fichiers de grilles modifiés) : relancer avec --update")
+        return 2
+    if baseline["engine_version"] != ENGINE_VERSION:
+        print(f"Attention : référence créée avec la version {baseline['engine_version']} des moteurs (actuelle : {ENGINE_VERSION})")
+
+    tolerances = tolerance_thresholds(args.tolerance, args.percentile_tolerance, args.throughput_tolerance)
+    failed = False
+    for engine, current in results.items():
+        if engine not in baseline["engines"]:
+            print(f"== {engine} ==\n  absent de la référence, ignoré")
+            continue
+        regression, lines = compare_engine(engine, baseline["engines"][engine], current, tolerances)
+        failed |= regression
+        print("\n".join(lines))
+
+    print("RÉGRESSION DÉTECTÉE" if failed else "Aucune régression")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import numpy as np
+
+# Graphe de contraintes du Sudoku : 81 sommets (cases, index = 9 * ligne + colonne), une arête
+# entre deux cases qui partagent une ligne, une colonne ou une sous-grille (20 voisins par case).
+# Il est calculé une seule fois, au format CSR : les voisins de la case i sont
+# PEER_INDICES[PEER_INDPTR[i]:PEER_INDPTR[i + 1]].
+
+NUM_CELLS = 81
+NUM_PEERS = 20
+
+# Les 27 unités (9 lignes, 9 colonnes, 9 sous-grilles), 9 cases chacune
+UNIT_CELLS = np.array(
+    [[9 * row + col for col in range(9)] for row in range(9)]
+    + [[9 * row + col for row in range(9)] for col in range(9)]
+    + [[9 * (3 * (box // 3) + i // 3) + 3 * (box % 3) + i % 3 for i in range(9)] for box in range(9)],
+    dtype=np.uint8,
+)
+
+# Les 3 unités de chaque case : ligne, colonne, sous-grille
+CELL_UNITS = np.array(
+    [[cell // 9, 9 + cell % 9, 18 + 3 * (cell // 27) + (cell % 9) // 3] for cell in range(NUM_CELLS)],
+    dtype=np.uint8,
+)
+
+def _build_peer_csr():
+    indices = []
+    for cell in range(NUM_CELLS):
+        peers = set(UNIT_CELLS[CELL_UNITS[cell]].ravel().tolist()) - {cell}
+        indices.extend(sorted(peers))
+    indptr = np.arange(0, NUM_CELLS * NUM_PEERS + 1, NUM_PEERS, dtype=np.int32)
+    return indptr, np.array(indices, dtype=np.uint8)
+
+PEER_INDPTR, PEER_INDICES = _build_peer_csr()
+
+# Même chose en tuples Python, pour les boucles des moteurs (plus rapides que l'indexation NumPy)
+PEERS = [tuple(PEER_INDICES[PEER_INDPTR[cell]:PEER_INDPTR[cell + 1]].tolist()) for cell in range(NUM_CELLS)]
+UNITS = [tuple(unit.tolist()) for unit in UNIT_CELLS]
+
+# Pour une grille NumPy 9x9 : board.ravel()[PEER_MATRIX[cell]] donne les valeurs des 20 voisins
+PEER_MATRIX = PEER_INDICES.reshape(NUM_CELLS, NUM_PEERS).astype(np.intp)
+
+def to_networkx(board=None):
+    """
+    Exporte le graphe vers networkx (pour l'analyse). Si une grille est donnée,
+    chaque sommet porte sa valeur dans l'attribut "value" (0 = vide).
+    """
+    import networkx as nx
+
+    graph = nx.Graph()
+    for cell in range(NUM_CELLS):
+        row, col = divmod(cell, 9)
+        attributes = {"row": row, "col": col}
+        if board is not None:
+            attributes["value"] = int(board[row, col])
+        graph.add_node(cell, **attributes)
+    graph.add_edges_from((cell, peer) for cell in range(NUM_CELLS) for peer in PEERS[cell] if peer > cell)
+    return graph
+
+def solve_dsatur(board, budget=None, tracer=None):
+    """
+    Résout la grille comme un problème de coloration du graphe de contraintes (9 couleurs)
+    avec l'heuristique DSATUR : on colore d'abord le sommet dont les voisins utilisent le plus
+    de couleurs différentes (saturation), à égalité celui qui a le plus de voisins non colorés.
+    La saturation est mise à jour incrémentalement et sert de vérification en avant :
+    une case vide dont les voisins utilisent les 9 couleurs coupe la branche.
+    Fonctionne sur une matrice NumPy ou un CompactBoard ; la grille est remplie sur place.
+    """
+    values = [int(board[divmod(cell, 9)]) for cell in range(NUM_CELLS)]
+    color_counts = [[0] * 10 for _ in range(NUM_CELLS)]  # Voisins de chaque couleur
+    saturation = [0] * NUM_CELLS  # Masque des couleurs utilisées par les voisins (bits 1 à 9)
+    free_degree = [sum(1 for peer in PEERS[cell] if values[peer] == 0) for cell in range(NUM_CELLS)]
+    uncolored = {cell for cell in range(NUM_CELLS) if values[cell] == 0}
+
+    def assign(cell, color):
+        """Colore la case ; renvoie False si un voisin vide n'a plus aucune couleur possible."""
+        values[cell] = color
+        feasible = True
+        for peer in PEERS[cell]:
+            counts = color_counts[peer]
+            counts[color] += 1
+            if counts[color] == 1:
+                saturation[peer] |= 1 << color
+            free_degree[peer] -= 1
+            if values[peer] == 0 and saturation[peer] == 0b1111111110:
+                feasible = False
+        return feasible
+
+    def unassign(cell, color):
+        values[cell] = 0
+        for peer in PEERS[cell]:
+            counts = color_counts[peer]
+            counts[color] -= 1
+            if counts[color] == 0:
+                saturation[peer] &= ~(1 << color)
+            free_degree[peer] += 1
+
+    for cell in range(NUM_CELLS):
+        color = values[cell]
+        if color:
+            for peer in PEERS[cell]:
+                color_counts[peer][color] += 1
+                saturation[peer] |= 1 << color
+
+    # Indices incompatibles entre eux : pas de solution
+    if any(values[cell] and saturation[cell] >> values[cell] & 1 for cell in range(NUM_CELLS)):
+        return False
+
+    def search():
+        if budget is not None:
+            budget.tick()
+        if not uncolored:
+            return True
+
+        # DSATUR : saturation maximale, puis degré non coloré maximal
+        cell = max(uncolored, key=lambda v: (bin(saturation[v]).count("1"), free_degree[v], -v))
+        row, col = divmod(cell, 9)
+        if tracer is not None:
+            tracer.select(row, col)
+
+        uncolored.discard(cell)
+        for color in range(1, 10):
+            if saturation[cell] >> color & 1:
+                continue
+            feasible = assign(cell, color)
+            if tracer is not None:
+                tracer.place(row, col, color)
+            if feasible and search():
+                return True
+            unassign(cell, color)
+            if tracer is not None:
+                tracer.backtrack(row, col, color)
+        uncolored.add(cell)
+        return False
+
+    if not search():
+        return False
+
+    for cell in range(NUM_CELLS):
+        board[divmod(cell, 9)] = values[cell]
+    return True
@@ -0,0 +1,195 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Index des solutions par contenu : la clé est une empreinte de 128 bits de la grille
+# (et non plus sa position iloc dans grilles_*_avec_rep.csv). Sur disque, c'est une table
+# de hachage à adressage ouvert lue par mmap : une recherche ne lit que quelques cases,
+# sans charger le fichier des réponses.
+
+DEFAULT_PATH = 'index_solutions.bin'
+MAGIC = b"SUDOKUIX"
+HEADER = struct.Struct("<8sIQQ")  # magic, version, capacité, nombre d'entrées
+HEADER_SIZE = 32
+DIGEST_SIZE = 16
+PACKED_SIZE = 41  # 81 chiffres sur 4 bits
+SLOT_SIZE = DIGEST_SIZE + PACKED_SIZE
+EMPTY_DIGEST = bytes(DIGEST_SIZE)
+CHUNK_SIZE = 100_000
+
+def normalize(sudoku_string):
+    """Même grille, même clé : les cases vides sont toujours notées '0'."""
+    return sudoku_string.strip().replace('.', '0')
+
+def puzzle_digest(sudoku_string):
+    """Empreinte de 128 bits de la grille."""
+    return hashlib.blake2b(normalize(sudoku_string).encode("ascii"), digest_size=DIGEST_SIZE).digest()
+
+def pack_solution(solution_string):
+    digits = np.frombuffer(normalize(solution_string).encode("ascii"), dtype=np.uint8) - ord('0')
+    digits = np.append(digits, 0)  # 82 chiffres -> 41 octets
+    return (digits[0::2] << 4 | digits[1::2]).astype(np.uint8).tobytes()
+
+def unpack_solution(packed):
+    data = np.frombuffer(packed, dtype=np.uint8)
+    digits = np.empty(82, dtype=np.uint8)
+    digits[0::2] = data >> 4
+    digits[1::2] = data & 0x0F
+    return (digits[:81] + ord('0')).tobytes().decode("ascii")
+
+def clues_match(puzzle, solution):
+    """Vérifie que la solution reprend bien les indices de la grille (détecte un mauvais appariement)."""
+    return all(p in '0.' or p == s for p, s in zip(puzzle, solution))
+
+def read_pairs(sans_rep_path, avec_rep_path):
+    """
+    Parcourt un couple de fichiers par morceaux et renvoie les (grille, solution).
+    Si le fichier des réponses a une colonne 'puzzle', l'appariement se fait par contenu ;
+    sinon par position, une seule fois, avec contrôle des indices.
+    """
+    columns = pd.read_csv(avec_rep_path, nrows=0).columns
+    if 'puzzle' in columns:
+        for chunk in pd.read_csv(avec_rep_path, dtype=str, chunksize=CHUNK_SIZE):
+            yield from zip(chunk['puzzle'], chunk['solution'])
+        return
+
+    puzzles = pd.read_csv(sans_rep_path, dtype=str, chunksize=CHUNK_SIZE)
+    solutions = pd.read_csv(avec_rep_path, dtype=str, chunksize=CHUNK_SIZE)
+    for puzzle_chunk, solution_chunk in zip(puzzles, solutions):
+        for puzzle, solution in zip(puzzle_chunk['puzzle'], solution_chunk['solution']):
+            if not clues_match(puzzle, solution):
+                raise ValueError(f"{avec_rep_path} : la solution ne correspond pas à la grille {puzzle}")
+            yield puzzle, solution
+
+def build_index(pairs, path=DEFAULT_PATH):
+    """
+    Écrit l'index sur disque à partir d'un itérable de (grille, solution).
+    Renvoie le nombre de grilles distinctes. Une même grille avec deux solutions
+    différentes lève une ValueError.
+    """
+    entries = {}
+    for puzzle, solution in pairs:
+        digest = puzzle_digest(puzzle)
+        packed = pack_solution(solution)
+        if entries.setdefault(digest, packed) != packed:
+            raise ValueError(f"Deux solutions différentes pour la grille {puzzle}")
+
+    capacity = 1
+    while capacity < 2 * len(entries):  # Taux de remplissage <= 50 %
+        capacity *= 2
+    mask = capacity - 1
+
+    table = bytearray(HEADER_SIZE + capacity * SLOT_SIZE)
+    table[:HEADER.size] = HEADER.pack(MAGIC, 1, capacity, len(entries))
+    for digest, packed in entries.items():
+        slot = int.from_bytes(digest[:8], "little") & mask
+        while True:
+            offset = HEADER_SIZE + slot * SLOT_SIZE
+            if table[offset:offset + DIGEST_SIZE] == EMPTY_DIGEST:
+                table[offset:offset + SLOT_SIZE] = digest + packed
+                break
+            slot = (slot + 1) & mask
+
+    with open(path, "wb") as f:
+        f.write(table)
+    return len(entries)
+
+class SolutionIndex:
+    """Lecture de l'index : recherche en O(1) de la solution d'une grille."""
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.capacity, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != 1:
+            raise ValueError(f"{path} n'est pas un index de solutions")
+        self._mask = self.capacity - 1
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, sudoku_string):
+        return self.get(sudoku_string) is not None
+
+    def get(self, sudoku_string):
+        """Solution de la grille (chaîne de 81 chiffres), ou None si elle n'est pas indexée."""
+        digest = puzzle_digest(sudoku_string)
+        slot = int.from_bytes(digest[:8], "little") & self._mask
+        while True:
+            offset = HEADER_SIZE + slot * SLOT_SIZE
+            stored = self._map[offset:offset + DIGEST_SIZE]
+            if stored == digest:
+                return unpack_solution(self._map[offset + DIGEST_SIZE:offset + SLOT_SIZE])
+            if stored == EMPTY_DIGEST:
+                return None
+            slot = (slot + 1) & self._mask
+
+    def get_many(self, sudoku_strings):
+        """
+        Solutions de référence d'un lot, au format de verify_solutions_bulk :
+        renvoie (tableau (N, 81) uint8, masque des grilles trouvées).
+        """
+        references = np.zeros((len(sudoku_strings), 81), dtype=np.uint8)
+        found = np.zeros(len(sudoku_strings), dtype=bool)
+        for i, sudoku_string in enumerate(sudoku_strings):
+            solution = self.get(sudoku_string)
+            if solution is not None:
+                references[i] = np.frombuffer(solution.encode("ascii"), dtype=np.uint8) - ord('0')
+                found[i] = True
+        return references, found
+
+def find_duplicates(paths):
+    """Grilles présentes plusieurs fois, dans un même fichier ou entre fichiers : {grille: [(fichier, ligne), ...]}."""
+    seen = {}
+    for path in paths:
+        row = 0
+        for chunk in pd.read_csv(path, dtype=str, usecols=['puzzle'], chunksize=CHUNK_SIZE):
+            for puzzle in chunk['puzzle']:
+                seen.setdefault(puzzle_digest(puzzle), []).append((normalize(puzzle), path, row))
+                row += 1
+
+    return {
+        occurrences[0][0]: [(path, row) for _, path, row in occurrences]
+        for occurrences in seen.values() if len(occurrences) > 1
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construit l'index des solutions par contenu.")
+    parser.add_argument("files", nargs="+", help="couples grilles_*_sans_rep.csv grilles_*_avec_rep.csv")
+    parser.add_argument("-o", "--output", default=DEFAULT_PATH)
+    parser.add_argument("--duplicates", action="store_true", help="liste les grilles en double entre les fichiers")
+    args = parser.parse_args(argv)
+
+    if len(args.files) % 2:
+        parser.error("les fichiers doivent être donnés par couples (sans_rep, avec_rep)")
+    couples = list(zip(args.files[0::2], args.files[1::2]))
+
+    if args.duplicates:
+        duplicates = find_duplicates([sans_rep for sans_rep, _ in couples])
+        for puzzle, occurrences in duplicates.items():
+            print(puzzle, " ".join(f"{path}:{row}" for path, row in occurrences))
+        print(f"{len(duplicates)} grille(s) en double")
+
+    pairs = (pair for sans_rep, avec_rep in couples for pair in read_pairs(sans_rep, avec_rep))
+    count = build_index(pairs, args.output)
+    print(f"{count} grilles indexées dans {args.output} ({os.path.getsize(args.output) / 1024 ** 2:.1f} MB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
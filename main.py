@@ -1,26 +1,26 @@
 import numpy as np
 import pandas as pd
 
+from graphe_contraintes import PEER_MATRIX, solve_dsatur
+from plateau import CompactBoard
+
 # Ton algorithme de résolution de Sudoku
 def get_valid_numbers(board, row, col):
     """
     Renvoie un ensemble de valeurs possibles pour une case spécifique
     en fonction des valeurs déjà présentes dans la ligne, la colonne et la sous-grille.
     """
+    if isinstance(board, CompactBoard):
+        return board.candidates(row, col)
+
     if board[row, col] != 0:
         return set()
 
     possible_numbers = set(range(1, 10))
 
-    # Supprime les numéros déjà présents dans la ligne
-    possible_numbers -= set(board[row, :])
-
-    # Supprime les numéros déjà présents dans la colonne
-    possible_numbers -= set(board[:, col])
-
-    # Supprime les numéros déjà présents dans la sous-grille 3x3
-    start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-    possible_numbers -= set(board[start_row:start_row + 3, start_col:start_col + 3].flatten())
+    # Supprime les numéros déjà présents chez les 20 voisins (ligne, colonne et sous-grille 3x3),
+    # lus en une seule fois grâce au graphe de contraintes
+    possible_numbers -= set(board.ravel()[PEER_MATRIX[9 * row + col]].tolist())
 
     return possible_numbers
 
@@ -29,6 +29,9 @@ def find_most_constrained_location(board):
     Trouve la case vide avec le moins d'options possibles pour faciliter le backtracking,
     en utilisant les fonctionnalités de NumPy pour l'optimisation.
     """
+    if isinstance(board, CompactBoard):
+        return board.most_constrained()
+
     empty_positions = np.argwhere(board == 0)
     if empty_positions.size == 0:
         return None  # Aucune case vide
@@ -49,49 +52,158 @@ def find_most_constrained_location(board):
 
     return best_position
 
-def solve_sudoku(board):
+def solve_sudoku(board, budget=None, tracer=None, nogoods=None):
     """
     Résout la grille de Sudoku en utilisant une approche de backtracking optimisée.
+    `budget` (SolveBudget, optionnel) limite le temps ou le nombre de nœuds explorés.
+    `tracer` (TraceWriter, optionnel) reçoit les choix de case, placements et retours en arrière.
+    `nogoods` (NogoodTable, optionnel, initialisée avec nogoods.start(board)) mémorise les grilles
+    sans solution pour couper les branches déjà explorées.
     """
+    if budget is not None:
+        budget.tick()
+    if nogoods is not None and nogoods.is_nogood():
+        return False
+
     empty = find_most_constrained_location(board)
     if not empty:
         return True  # Plus de cases vides, la grille est résolue
     row, col = empty
 
+    if tracer is not None:
+        tracer.select(row, col)
+
     for num in get_valid_numbers(board, row, col):
-        board[row][col] = num
+        board[row, col] = num
+        if nogoods is not None:
+            nogoods.toggle(row, col, num)
+        if tracer is not None:
+            tracer.place(row, col, num)
 
-        if solve_sudoku(board):
+        if solve_sudoku(board, budget, tracer, nogoods):
             return True
 
         # Backtracking
-        board[row][col] = 0
+        board[row, col] = 0
+        if nogoods is not None:
+            nogoods.toggle(row, col, num)
+        if tracer is not None:
+            tracer.backtrack(row, col, num)
+
+    # Sous-arbre entièrement exploré sans solution
+    if nogoods is not None:
+        nogoods.add_nogood()
+    return False
+
+def count_solutions(board, limit=2, budget=None):
+    """
+    Compte les solutions de la grille en s'arrêtant dès que `limit` est atteint
+    (limit=2 suffit pour vérifier l'unicité). La grille est remise dans son état initial.
+    """
+    if budget is not None:
+        budget.tick()
+
+    empty = find_most_constrained_location(board)
+    if not empty:
+        return 1
+    row, col = empty
+
+    total = 0
+    for num in get_valid_numbers(board, row, col):
+        board[row, col] = num
+        total += count_solutions(board, limit - total, budget)
+        board[row, col] = 0
+
+        if total >= limit:
+            break
+
+    return total
+
+def is_safe(board, row, col, num):
+    """Vérifie qu'un nombre peut être placé dans la case (ligne, colonne et sous-grille)."""
+    if isinstance(board, CompactBoard):
+        return board.is_safe(row, col, num)
+
+    return num not in board.ravel()[PEER_MATRIX[9 * row + col]].tolist()
+
+def find_empty_location(board):
+    """Renvoie la première case vide dans l'ordre de lecture."""
+    if isinstance(board, CompactBoard):
+        return board.find_empty()
+
+    for i in range(9):
+        for j in range(9):
+            if board[i, j] == 0:
+                return i, j
+    return None
+
+def solve_classic(board, budget=None, tracer=None):
+    """
+    Backtracking simple sans visualisation (même parcours que ClassicBacktrackingSolver) :
+    première case vide, valeurs essayées de 1 à 9.
+    """
+    if budget is not None:
+        budget.tick()
+
+    empty = find_empty_location(board)
+    if not empty:
+        return True
+    row, col = empty
+
+    if tracer is not None:
+        tracer.select(row, col)
+
+    for num in range(1, 10):
+        if is_safe(board, row, col, num):
+            board[row, col] = num
+            if tracer is not None:
+                tracer.place(row, col, num)
+
+            if solve_classic(board, budget, tracer):
+                return True
+
+            # Backtracking
+            board[row, col] = 0
+            if tracer is not None:
+                tracer.backtrack(row, col, num)
 
     return False
 
-# Code de test pour utiliser ton algorithme avec une grille de ton dataset
-# Charger les grilles depuis le fichier CSV (par exemple, les grilles difficiles)
-sudoku_df = pd.read_csv('grilles_difficile_sans_rep.csv')
+# Version des moteurs : à incrémenter quand un changement modifie les solutions ou les statistiques
+# (les résultats stockés avec une autre version sont ignorés)
+ENGINE_VERSION = "2"
 
-# Sélectionner une grille pour tester l'algorithme
-sudoku_string = sudoku_df['puzzle'].iloc[0]  # Utiliser la première grille du dataset
+# Moteurs disponibles sans interface graphique, par nom
+ENGINES = {
+    "mrv": solve_sudoku,
+    "classique": solve_classic,
+    "dsatur": solve_dsatur,
+}
 
 # Fonction pour convertir une chaîne de caractères en matrice NumPy
 def string_to_matrix(sudoku_string):
     return np.array([int(char) if char != '.' else 0 for char in sudoku_string]).reshape(9, 9)
 
-# Convertir la grille en matrice NumPy
-sudoku_matrix = string_to_matrix(sudoku_string)
+if __name__ == "__main__":
+    # Code de test pour utiliser ton algorithme avec une grille de ton dataset
+    # Charger les grilles depuis le fichier CSV (par exemple, les grilles difficiles)
+    sudoku_df = pd.read_csv('grilles_difficile_sans_rep.csv')
+
+    # Sélectionner une grille pour tester l'algorithme
+    sudoku_string = sudoku_df['puzzle'].iloc[0]  # Utiliser la première grille du dataset
+
+    # Convertir la grille en matrice NumPy
+    sudoku_matrix = string_to_matrix(sudoku_string)
 
-print("Grille initiale :")
-print(sudoku_matrix)
+    print("Grille initiale :")
+    print(sudoku_matrix)
 
-# Appeler l'algorithme de résolution
-if solve_sudoku(sudoku_matrix):
-    print("Sudoku résolu avec succès !")
-else:
-    print("Aucune solution n'existe.")
+    # Appeler l'algorithme de résolution
+    if solve_sudoku(sudoku_matrix):
+        print("Sudoku résolu avec succès !")
+    else:
+        print("Aucune solution n'existe.")
 
-# Afficher la grille résolue
-print("Grille résolue :")
-print(sudoku_matrix)
\ No newline at end of file
+    # Afficher la grille résolue
+    print("Grille résolue :")
+    print(sudoku_matrix)
\ No newline at end of file
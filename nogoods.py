@@ -0,0 +1,119 @@
+import random
+import sys
+
+import pandas as pd
+
+# Table de transposition des états prouvés sans solution (« nogoods »), indexée par hachage
+# de Zobrist : une clé aléatoire de 64 bits par (case, valeur), le hachage d'une grille est le
+# XOR des clés de ses cases remplies, mis à jour en O(1) à chaque placement ou retrait.
+# Une grille dont tout le sous-arbre a été exploré sans succès est enregistrée ; si la recherche
+# retombe sur la même grille, la branche est coupée immédiatement.
+
+ZOBRIST_SEED = 20241019
+_random = random.Random(ZOBRIST_SEED)
+ZOBRIST_KEYS = [[0] + [_random.getrandbits(64) for _ in range(9)] for _ in range(81)]
+
+def board_hash(board):
+    """Hachage de Zobrist complet d'une grille (NumPy ou CompactBoard)."""
+    value = 0
+    for cell in range(81):
+        digit = int(board[divmod(cell, 9)])
+        if digit:
+            value ^= ZOBRIST_KEYS[cell][digit]
+    return value
+
+class NogoodTable:
+    """
+    Ensemble borné de hachages de grilles sans solution. Au-delà de `max_entries`,
+    l'entrée la moins récemment utilisée est supprimée.
+    Appeler start(board) avant chaque résolution pour initialiser le hachage courant.
+    """
+    __slots__ = ("max_entries", "table", "hash", "lookups", "hits", "stores", "evictions")
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self.table = {}
+        self.hash = 0
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def start(self, board):
+        self.hash = board_hash(board)
+
+    def toggle(self, row, col, num):
+        """À appeler à chaque placement et à chaque retrait de `num` dans la case."""
+        self.hash ^= ZOBRIST_KEYS[9 * row + col][num]
+
+    def is_nogood(self):
+        self.lookups += 1
+        if self.hash in self.table:
+            self.hits += 1
+            # Réinsertion : l'entrée devient la plus récente
+            del self.table[self.hash]
+            self.table[self.hash] = True
+            return True
+        return False
+
+    def add_nogood(self):
+        self.table[self.hash] = True
+        self.stores += 1
+        if len(self.table) > self.max_entries:
+            del self.table[next(iter(self.table))]
+            self.evictions += 1
+
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def memory_bytes(self):
+        """Estimation de la mémoire occupée (dictionnaire + clés entières)."""
+        return sys.getsizeof(self.table) + len(self.table) * sys.getsizeof(1 << 63)
+
+    def stats(self):
+        return {
+            "entries": len(self.table),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate(),
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "memory_bytes": self.memory_bytes(),
+        }
+
+def measure_nogoods(sudoku_strings, max_entries=100_000, first_budget=1000):
+    """
+    Mesure l'effet de la table sur le nombre de nœuds, dans deux cas :
+    - une résolution MRV simple ;
+    - une résolution par budgets croissants (limite de nœuds doublée à chaque nouvel essai,
+      comme pour un lot relancé après timeout), où la table est conservée entre les essais.
+    """
+    from budget import solve_with_budget
+    from main import string_to_matrix
+
+    totals = {"plain": 0, "plain_nogoods": 0, "restarts": 0, "restarts_nogoods": 0}
+    table = NogoodTable(max_entries)
+    for sudoku_string in sudoku_strings:
+        totals["plain"] += solve_with_budget(string_to_matrix(sudoku_string), "mrv")["nodes"]
+        totals["plain_nogoods"] += solve_with_budget(string_to_matrix(sudoku_string), "mrv", nogoods=NogoodTable(max_entries))["nodes"]
+
+        for key, nogoods in (("restarts", None), ("restarts_nogoods", table)):
+            max_nodes = first_budget
+            while True:
+                result = solve_with_budget(string_to_matrix(sudoku_string), "mrv", max_nodes=max_nodes, nogoods=nogoods)
+                totals[key] += result["nodes"]
+                if result["status"] != "node_limit":
+                    break
+                max_nodes *= 2
+
+    return totals, table.stats()
+
+if __name__ == "__main__":
+    sudoku_df = pd.read_csv('grilles_difficile_sans_rep.csv', dtype=str)
+    totals, stats = measure_nogoods(list(sudoku_df['puzzle'].iloc[:50]))
+
+    print(f"Résolution simple : {totals['plain']} nœuds, avec table : {totals['plain_nogoods']} nœuds")
+    print(f"Budgets croissants : {totals['restarts']} nœuds, avec table : {totals['restarts_nogoods']} nœuds "
+          f"({1 - totals['restarts_nogoods'] / max(totals['restarts'], 1):.1%} de moins)")
+    print(f"Table : {stats['entries']} entrées, {stats['memory_bytes'] / 1024:.0f} KB, "
+          f"taux de succès {stats['hit_rate']:.1%}, {stats['evictions']} évictions")
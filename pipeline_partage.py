@@ -0,0 +1,218 @@
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from budget import solve_with_budget
+from main import ENGINES
+from plateau import CompactBoard
+from verification import STATUS_LABELS, strings_to_array, summarize_statuses, verify_solutions_bulk
+
+# Traitement d'un gros lot de grilles sans copie entre processus : les grilles lues sont
+# rangées dans un bloc (N, 81) uint8 en mémoire partagée, les processus résolvent directement
+# dans un second bloc partagé pour les solutions et ne renvoient que des statistiques par tranche.
+# Les étapes se recouvrent : pendant que les processus résolvent une tranche, le processus
+# principal lit et convertit les suivantes, vérifie celles qui sont terminées, et un thread
+# écrit les résultats sur disque.
+
+SOLVE_STATUSES = ("solved", "unsolvable", "timeout", "node_limit", "cancelled")
+SOLVE_STATUS_CODES = {status: code for code, status in enumerate(SOLVE_STATUSES)}
+DEFAULT_CHUNK_SIZE = 1000
+
+# Vues sur les blocs partagés, créées une fois par processus
+_puzzles = None
+_solutions = None
+_shared_blocks = None
+
+def _attach(puzzles_name, solutions_name, count):
+    """Initialisation d'un processus : ouvre les deux blocs partagés par leur nom."""
+    global _puzzles, _solutions, _shared_blocks
+    _shared_blocks = (shared_memory.SharedMemory(name=puzzles_name), shared_memory.SharedMemory(name=solutions_name))
+    _puzzles = np.ndarray((count, 81), dtype=np.uint8, buffer=_shared_blocks[0].buf)
+    _solutions = np.ndarray((count, 81), dtype=np.uint8, buffer=_shared_blocks[1].buf)
+
+def _solve_range(task):
+    """
+    Tâche d'un processus : résout les grilles [start, stop) et écrit les solutions dans le
+    bloc partagé. Seuls les statuts, nœuds et temps reviennent au processus principal.
+    """
+    start, stop, engine, time_limit = task
+    statuses = np.empty(stop - start, dtype=np.uint8)
+    nodes = np.empty(stop - start, dtype=np.int64)
+    times = np.empty(stop - start, dtype=np.float64)
+
+    for offset, index in enumerate(range(start, stop)):
+        board = CompactBoard(_puzzles[index].tobytes())
+        result = solve_with_budget(board, engine, time_limit)
+        if result["status"] == "solved":
+            _solutions[index] = np.frombuffer(board.cells, dtype=np.uint8)
+        statuses[offset] = SOLVE_STATUS_CODES[result["status"]]
+        nodes[offset] = result["nodes"]
+        times[offset] = result["time"]
+
+    return start, stop, statuses, nodes, times
+
+def count_rows(csv_path):
+    """Nombre de grilles du fichier (lignes moins l'en-tête), pour dimensionner les blocs partagés."""
+    lines = 0
+    last_byte = b"\n"
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        lines += 1  # Dernière ligne sans retour à la ligne
+    return lines - 1
+
+def _format_rows(puzzles, solutions, statuses, verification, nodes, times):
+    """Lignes CSV d'une tranche ; les grilles non résolues ont une solution vide."""
+    puzzle_strings = (puzzles + ord('0')).view('S81').ravel()
+    solution_strings = (solutions + ord('0')).view('S81').ravel()
+    lines = []
+    for i in range(len(puzzles)):
+        solution = solution_strings[i].decode() if statuses[i] == SOLVE_STATUS_CODES["solved"] else ""
+        lines.append(f"{puzzle_strings[i].decode()},{solution},{SOLVE_STATUSES[statuses[i]]},"
+                     f"{verification[i]},{nodes[i]},{times[i]:.6f}\n")
+    return "".join(lines)
+
+def _writer(path, lines_queue):
+    """Étape d'écriture (thread) : écrit les tranches dans l'ordre où elles arrivent dans la file."""
+    with open(path, "w") as f:
+        f.write("puzzle,solution,status,verification,nodes,time\n")
+        while True:
+            text = lines_queue.get()
+            if text is None:
+                break
+            f.write(text)
+
+def run_pipeline(csv_path, output_path=None, engine="mrv", workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 time_limit=None):
+    """
+    Résout toutes les grilles de `csv_path` (colonne 'puzzle' ; si une colonne 'solution'
+    est présente, elle sert de référence pour la vérification).
+    Les résultats sont écrits dans `output_path` (CSV, dans l'ordre du fichier d'entrée) si donné.
+    Renvoie un résumé : nombre de grilles, statuts de résolution et de vérification,
+    nœuds, temps total et débit.
+    """
+    start_time = time.perf_counter()
+    count = count_rows(csv_path)
+    if count <= 0:
+        return {"puzzles": 0}
+    workers = workers or os.cpu_count() or 1
+
+    puzzles_block = shared_memory.SharedMemory(create=True, size=count * 81)
+    solutions_block = shared_memory.SharedMemory(create=True, size=count * 81)
+    puzzles = solutions = None
+    try:
+        puzzles = np.ndarray((count, 81), dtype=np.uint8, buffer=puzzles_block.buf)
+        solutions = np.ndarray((count, 81), dtype=np.uint8, buffer=solutions_block.buf)
+        solutions[:] = 0
+
+        statuses = np.zeros(count, dtype=np.uint8)
+        verification = np.zeros(count, dtype=np.int8)
+        nodes = np.zeros(count, dtype=np.int64)
+        times = np.zeros(count, dtype=np.float64)
+        references = {}  # Solutions de référence par tranche, libérées après vérification
+
+        lines_queue = queue.Queue(maxsize=8)
+        writer = None
+        if output_path is not None:
+            writer = threading.Thread(target=_writer, args=(output_path, lines_queue), daemon=True)
+            writer.start()
+
+        finished = {}
+        next_to_write = 0
+
+        def collect(result):
+            """Vérifie une tranche terminée, puis transmet au thread d'écriture les tranches prêtes dans l'ordre."""
+            nonlocal next_to_write
+            start, stop, chunk_statuses, chunk_nodes, chunk_times = result
+            statuses[start:stop] = chunk_statuses
+            nodes[start:stop] = chunk_nodes
+            times[start:stop] = chunk_times
+            verification[start:stop] = verify_solutions_bulk(solutions[start:stop], puzzles[start:stop],
+                                                             references.pop(start, None))
+            finished[start] = stop
+            while next_to_write in finished:
+                stop = finished.pop(next_to_write)
+                if writer is not None:
+                    lines_queue.put(_format_rows(puzzles[next_to_write:stop], solutions[next_to_write:stop],
+                                                 statuses[next_to_write:stop], verification[next_to_write:stop],
+                                                 nodes[next_to_write:stop], times[next_to_write:stop]))
+                next_to_write = stop
+
+        with mp.Pool(processes=workers, initializer=_attach,
+                     initargs=(puzzles_block.name, solutions_block.name, count)) as pool:
+            pending = []
+            start = 0
+            for chunk in pd.read_csv(csv_path, dtype=str, chunksize=chunk_size):
+                stop = start + len(chunk)
+                puzzles[start:stop] = strings_to_array(chunk['puzzle'])
+                if 'solution' in chunk:
+                    references[start] = strings_to_array(chunk['solution'])
+                pending.append(pool.apply_async(_solve_range, ((start, stop, engine, time_limit),)))
+                start = stop
+
+                # Vérifie et écrit ce qui est déjà terminé pendant la lecture
+                while pending and pending[0].ready():
+                    collect(pending.pop(0).get())
+
+            for async_result in pending:
+                collect(async_result.get())
+
+        if writer is not None:
+            lines_queue.put(None)
+            writer.join()
+
+        # Lignes vides éventuelles en fin de fichier : elles ne correspondent à aucune grille
+        count = start
+        statuses, verification, nodes, times = statuses[:count], verification[:count], nodes[:count], times[:count]
+
+        elapsed = time.perf_counter() - start_time
+        solve_codes, solve_counts = np.unique(statuses, return_counts=True)
+        summary = {
+            "puzzles": count,
+            "status": {SOLVE_STATUSES[code]: int(total) for code, total in zip(solve_codes, solve_counts)},
+            "verification": summarize_statuses(verification),
+            "nodes": int(nodes.sum()),
+            "solve_time": float(times.sum()),
+            "time": elapsed,
+            "throughput": count / elapsed,
+        }
+    finally:
+        puzzles = solutions = None  # Les vues doivent disparaître avant de fermer les blocs
+        puzzles_block.close()
+        puzzles_block.unlink()
+        solutions_block.close()
+        solutions_block.unlink()
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résolution d'un gros lot de grilles en mémoire partagée.")
+    parser.add_argument("csv", help="fichier de grilles (colonne 'puzzle', 'solution' optionnelle)")
+    parser.add_argument("--output", help="fichier CSV des résultats")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="mrv")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--time-limit", type=float, help="délai maximal par grille (secondes)")
+    args = parser.parse_args(argv)
+
+    summary = run_pipeline(args.csv, args.output, args.engine, args.workers, args.chunk_size, args.time_limit)
+    if not summary["puzzles"]:
+        print("Aucune grille dans le fichier")
+        return 1
+    print(f"{summary['puzzles']} grilles en {summary['time']:.2f}s ({summary['throughput']:.0f} grilles/s), "
+          f"{summary['nodes']} nœuds")
+    print("Résolution :", summary["status"])
+    print("Vérification :", summary["verification"])
+    return 0 if set(summary["verification"]) == {STATUS_LABELS[0]} else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
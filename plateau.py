@@ -0,0 +1,156 @@
+import sys
+import time
+
+import numpy as np
+
+from graphe_contraintes import PEERS
+
+# Représentation compacte de la grille : 81 cases dans un bytearray (index = 9 * ligne + colonne).
+# Les voisins de chaque case viennent du graphe de contraintes (calculé une seule fois),
+# ce qui évite les découpes NumPy et le calcul 3 * (row // 3) à chaque appel.
+
+class CompactBoard:
+    """Grille de Sudoku stockée dans un bytearray de 81 octets (0 = case vide)."""
+    __slots__ = ("cells",)
+
+    def __init__(self, cells=None):
+        self.cells = bytearray(81) if cells is None else bytearray(cells)
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Construit la grille compacte à partir de la matrice NumPy 9x9."""
+        return cls(np.asarray(matrix, dtype=np.uint8).ravel().tobytes())
+
+    @classmethod
+    def from_string(cls, sudoku_string):
+        return cls(int(char) if char != '.' else 0 for char in sudoku_string)
+
+    def to_matrix(self):
+        """Renvoie la matrice NumPy 9x9 (int64, comme string_to_matrix)."""
+        return np.frombuffer(bytes(self.cells), dtype=np.uint8).reshape(9, 9).astype(np.int64)
+
+    def to_string(self):
+        return "".join(str(value) for value in self.cells)
+
+    def copy(self):
+        return CompactBoard(self.cells)
+
+    # Accès board[row, col] (même syntaxe que la matrice NumPy) ou board[index]
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.cells[9 * key[0] + key[1]]
+        return self.cells[key]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, tuple):
+            self.cells[9 * key[0] + key[1]] = value
+        else:
+            self.cells[key] = value
+
+    def candidates(self, row, col):
+        """Valeurs possibles pour une case, calculées à partir de la table des voisins."""
+        cells = self.cells
+        index = 9 * row + col
+        if cells[index] != 0:
+            return set()
+        # Même construction que get_valid_numbers : les candidats sortent dans le même ordre
+        possible_numbers = set(range(1, 10))
+        possible_numbers -= {cells[peer] for peer in PEERS[index]}
+        return possible_numbers
+
+    def is_safe(self, row, col, num):
+        cells = self.cells
+        for peer in PEERS[9 * row + col]:
+            if cells[peer] == num:
+                return False
+        return True
+
+    def find_empty(self):
+        """Première case vide dans l'ordre de lecture, ou None."""
+        index = self.cells.find(0)
+        if index < 0:
+            return None
+        return divmod(index, 9)
+
+    def most_constrained(self):
+        """Case vide avec le moins de candidats (arrêt anticipé à 0 ou 1 candidat), ou None."""
+        cells = self.cells
+        best_position = None
+        min_options = 10
+        for index in range(81):
+            if cells[index] != 0:
+                continue
+            num_options = 9 - len({cells[peer] for peer in PEERS[index]} - {0})
+            if num_options < min_options:
+                min_options = num_options
+                best_position = index
+                if min_options <= 1:
+                    break
+        if best_position is None:
+            return None
+        return divmod(best_position, 9)
+
+def compare_representations(sudoku_strings, engine):
+    """
+    Mesure le temps par nœud et la mémoire de la grille pour la matrice NumPy et
+    pour CompactBoard, en faisant résoudre les mêmes grilles au même moteur.
+    Les deux représentations explorent le même arbre (candidats dans le même ordre).
+    """
+    import main
+
+    # Un nœud = une recherche de case vide (MRV ou ordre de lecture selon le moteur)
+    original_finders = {
+        "find_most_constrained_location": main.find_most_constrained_location,
+        "find_empty_location": main.find_empty_location,
+    }
+    nodes = 0
+
+    def counting(finder):
+        def counting_finder(board):
+            nonlocal nodes
+            nodes += 1
+            return finder(board)
+        return counting_finder
+
+    results = {}
+    for name, build in (("numpy", main.string_to_matrix), ("compact", CompactBoard.from_string)):
+        nodes = 0
+        elapsed = 0.0
+        for finder_name, finder in original_finders.items():
+            setattr(main, finder_name, counting(finder))
+        try:
+            for sudoku_string in sudoku_strings:
+                board = build(sudoku_string)
+                start_time = time.perf_counter()
+                engine(board)
+                elapsed += time.perf_counter() - start_time
+        finally:
+            for finder_name, finder in original_finders.items():
+                setattr(main, finder_name, finder)
+
+        sample = build(sudoku_strings[0])
+        if name == "compact":
+            board_bytes = sys.getsizeof(sample) + sys.getsizeof(sample.cells)
+        else:
+            board_bytes = sys.getsizeof(np.copy(sample))  # En-tête + 81 entiers int64
+        results[name] = {
+            "nodes": nodes,
+            "time": elapsed,
+            "time_per_node_us": 1e6 * elapsed / max(nodes, 1),
+            "board_bytes": board_bytes,
+        }
+
+    return results
+
+if __name__ == "__main__":
+    import pandas as pd
+    from main import solve_classic, solve_sudoku
+
+    sudoku_df = pd.read_csv('grilles_difficile_sans_rep.csv')
+    sudoku_strings = list(sudoku_df['puzzle'].iloc[:20])
+
+    for engine in (solve_sudoku, solve_classic):
+        print(f"Moteur {engine.__name__}")
+        for name, stats in compare_representations(sudoku_strings, engine).items():
+            print(f"  {name:8s} : {stats['nodes']} nœuds, {stats['time']:.3f}s, "
+                  f"{stats['time_per_node_us']:.1f} µs/nœud, {stats['board_bytes']} octets par grille")
@@ -0,0 +1,209 @@
+import json
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+
+from budget import solve_with_budget
+from graphe_contraintes import PEERS
+from main import string_to_matrix
+from plateau import CompactBoard
+
+# Portefeuille de moteurs : des caractéristiques peu coûteuses de la grille servent à choisir
+# le moteur le plus rapide attendu. En option, deux moteurs sont mis en course (le second
+# démarre après une courte avance du premier) et le perdant est arrêté.
+# Chaque décision et son résultat sont journalisés pour pouvoir ajuster la politique.
+
+# Politique : les grilles sont classées selon le nombre de cases encore vides après propagation
+# des singletons (bornes des intervalles dans "bins"), avec un moteur par classe et un second
+# moteur pour la course. Valeurs initiales tirées d'un petit échantillon : utiliser
+# learn_policy sur des mesures de garde_performance.py pour les ajuster.
+DEFAULT_POLICY = {
+    "bins": [0, 1, 21, 41, 82],
+    "engines": ["mrv", "dsatur", "dsatur", "dsatur"],
+    "runner_up": ["dsatur", "mrv", "mrv", "mrv"],
+}
+
+def extract_features(board):
+    """
+    Caractéristiques de la grille : nombre d'indices, statistiques des candidats des cases vides,
+    et progression obtenue par simple propagation des singletons (sans recherche).
+    """
+    if isinstance(board, CompactBoard):
+        values = list(board.cells)
+    else:
+        values = [int(value) for value in np.asarray(board).ravel()]
+    clues = sum(1 for value in values if value)
+
+    def candidate_count(cell):
+        return 9 - len({values[peer] for peer in PEERS[cell]} - {0})
+
+    counts = [candidate_count(cell) for cell in range(81) if values[cell] == 0]
+
+    # Propagation des singletons : on remplit les cases à un seul candidat tant qu'il y en a
+    contradiction = False
+    progress = True
+    while progress and not contradiction:
+        progress = False
+        for cell in range(81):
+            if values[cell]:
+                continue
+            candidates = set(range(1, 10)) - {values[peer] for peer in PEERS[cell]}
+            if not candidates:
+                contradiction = True
+                break
+            if len(candidates) == 1:
+                values[cell] = candidates.pop()
+                progress = True
+
+    return {
+        "clues": clues,
+        "min_candidates": min(counts, default=0),
+        "mean_candidates": float(np.mean(counts)) if counts else 0.0,
+        "singles": sum(1 for count in counts if count == 1),
+        "empty_after_propagation": sum(1 for value in values if value == 0),
+        "contradiction": contradiction,
+    }
+
+def route(features, policy=DEFAULT_POLICY):
+    """Renvoie (moteur choisi, second moteur pour la course) pour ces caractéristiques."""
+    empty = features["empty_after_propagation"]
+    bucket = int(np.searchsorted(policy["bins"], empty, side="right")) - 1
+    bucket = min(max(bucket, 0), len(policy["engines"]) - 1)
+    return policy["engines"][bucket], policy["runner_up"][bucket]
+
+RACE_POLL_INTERVAL = 0.05  # Attente entre deux vérifications des processus de la course
+
+def _race_worker(engine, board, results, time_limit):
+    """Résout dans un processus de la course ; une exception devient un résultat "error"."""
+    start_time = time.perf_counter()
+    try:
+        result = solve_with_budget(board, engine, time_limit)
+    except Exception as exc:
+        result = {"status": "error", "engine": engine, "nodes": 0, "time": time.perf_counter() - start_time,
+                  "partial": None, "error": repr(exc)}
+    results.put((engine, board, result))
+
+def race(board, first, second, head_start=0.01, time_limit=None):
+    """
+    Lance `first`, puis `second` s'il n'a pas fini après `head_start` secondes (ou tout de suite
+    si `first` échoue). Le premier résultat concluant ("solved" ou "unsolvable") gagne et l'autre
+    processus est arrêté. `time_limit` s'applique à chaque moteur. Si aucun moteur ne conclut
+    (délai dépassé, erreur ou processus mort), le dernier résultat reçu est renvoyé, ou un
+    résultat "error". Le résultat porte "winner" (None sans gagnant) ; la grille est remplie
+    sur place si elle est résolue.
+    """
+    start_time = time.perf_counter()
+    results = mp.Queue()
+
+    def start(engine):
+        process = mp.Process(target=_race_worker, args=(engine, board.copy(), results, time_limit), daemon=True)
+        process.start()
+        processes[engine] = process
+
+    processes = {}
+    received = {}
+    winner = None
+    start(first)
+    try:
+        while winner is None:
+            try:
+                engine, solved_board, result = results.get(timeout=head_start if second not in processes else RACE_POLL_INTERVAL)
+            except queue.Empty:
+                if second not in processes:
+                    start(second)
+                elif all(not processes[engine].is_alive() for engine in processes if engine not in received):
+                    break  # Les processus restants sont morts sans répondre
+                continue
+
+            received[engine] = (solved_board, result)
+            if result["status"] in ("solved", "unsolvable"):
+                winner = engine
+            elif second not in processes and second != first:
+                start(second)  # Le premier moteur a échoué : le second part sans attendre
+            elif len(received) == len(processes):
+                break
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()  # Annule le perdant
+            process.join()
+
+    if winner is not None:
+        solved_board, result = received[winner]
+        board[:] = solved_board[:]
+    elif received:
+        result = list(received.values())[-1][1]
+    else:
+        result = {"status": "error", "engine": first, "nodes": 0, "time": time.perf_counter() - start_time,
+                  "partial": None, "error": "processus de la course arrêtés sans résultat"}
+    result["winner"] = winner
+    return result
+
+def solve_portfolio(board, policy=DEFAULT_POLICY, use_race=False, head_start=0.01, log_path=None, time_limit=None):
+    """
+    Choisit le moteur d'après les caractéristiques de la grille, puis résout (ou lance la course).
+    Le résultat est celui de solve_with_budget, complété par "features", "routed_to" et
+    "feature_time". `time_limit` (secondes) limite chaque moteur, course comprise.
+    Si `log_path` est donné (par exemple 'portfolio_log.jsonl'), la décision et son coût
+    sont ajoutés au journal, une ligne JSON par grille.
+    """
+    start_time = time.perf_counter()
+    features = extract_features(board)
+    feature_time = time.perf_counter() - start_time
+    engine, runner_up = route(features, policy)
+
+    if use_race and runner_up != engine:
+        result = race(board, engine, runner_up, head_start, time_limit)
+    else:
+        result = solve_with_budget(board, engine, time_limit)
+    result.update({
+        "features": features,
+        "routed_to": engine,
+        "feature_time": feature_time,
+        "wall_time": time.perf_counter() - start_time,  # Caractéristiques et processus de la course compris
+    })
+
+    if log_path is not None:
+        entry = {key: result[key] for key in ("routed_to", "status", "nodes", "time", "wall_time", "feature_time", "features")}
+        entry["winner"] = result.get("winner", engine)
+        with open(log_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    return result
+
+def learn_policy(benchmark_paths, bins=DEFAULT_POLICY["bins"]):
+    """
+    Construit une politique à partir de mesures enregistrées (JSON de garde_performance.py) :
+    dans chaque classe de grilles, le moteur au temps médian le plus faible est choisi,
+    et le suivant sert pour la course.
+    """
+    times_by_bucket = [dict() for _ in range(len(bins) - 1)]
+    for path in benchmark_paths:
+        with open(path) as f:
+            report = json.load(f)
+
+        empties = [extract_features(string_to_matrix(puzzle))["empty_after_propagation"] for puzzle in report["puzzles"]]
+        buckets = np.clip(np.searchsorted(bins, empties, side="right") - 1, 0, len(bins) - 2)
+        for engine, measures in report["engines"].items():
+            times = np.asarray(measures["times"])
+            for bucket in range(len(bins) - 1):
+                selected = times[buckets == bucket]
+                if selected.size:
+                    times_by_bucket[bucket].setdefault(engine, []).append(selected)
+
+    policy = {"bins": list(bins), "engines": [], "runner_up": []}
+    for by_engine in times_by_bucket:
+        ranking = sorted(by_engine, key=lambda engine: np.median(np.concatenate(by_engine[engine])))
+        # Classe sans mesure : moteurs par défaut
+        policy["engines"].append(ranking[0] if ranking else "mrv")
+        policy["runner_up"].append(ranking[1] if len(ranking) > 1 else "dsatur")
+    return policy
+
+def save_policy(policy, path):
+    with open(path, "w") as f:
+        json.dump(policy, f, indent=1)
+
+def load_policy(path):
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,136 @@
+import linecache
+import os
+import threading
+import tracemalloc
+
+# Profil mémoire d'une résolution avec tracemalloc : contrairement au RSS du processus
+# (qui inclut Tk, matplotlib et les DataFrames), on ne mesure que ce que la résolution alloue.
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Points chauds connus, reconnus d'après le texte de la ligne source
+HOTSPOT_PATTERNS = (
+    ("history", "copies de l'historique"),
+    ("set(", "construction des ensembles"),
+    ("argwhere", "recherche des cases vides"),
+    ("np.copy", "copies de grille"),
+)
+
+def _hotspot_label(filename, lineno):
+    source = linecache.getline(filename, lineno)
+    for pattern, label in HOTSPOT_PATTERNS:
+        if pattern in source:
+            return label
+    return source.strip() or "?"
+
+class MemoryProfile:
+    """
+    Contexte qui mesure une résolution :
+
+        with MemoryProfile() as profile:
+            solve_sudoku(board)
+        print(profile.peak_bytes, profile.live_blocks, profile.hotspots)
+
+    - peak_bytes : pic de mémoire allouée pendant la résolution
+    - live_blocks : blocs alloués par le code du projet pendant la résolution et encore vivants à la fin
+    - hotspots : [(libellé, "fichier:ligne", octets, blocs)] des lignes du projet qui occupent le plus
+      de mémoire pendant la résolution. Un thread prend un instantané toutes les `sample_interval`
+      secondes : les allocations de courte durée (ensembles de candidats, copies temporaires) y
+      apparaissent en proportion de leur taille et de leur durée de vie. Les valeurs sont les
+      moyennes par instantané.
+
+    Le nombre total d'allocations n'est pas mesuré : tracemalloc ne voit que les blocs vivants au
+    moment d'un instantané, et Python n'offre pas de compteur d'allocations. live_blocks et les
+    blocs des hotspots sont donc des blocs présents en mémoire, pas des nombres d'allocations.
+    """
+    def __init__(self, top=5, sample_interval=0.05):
+        self.top = top
+        self.sample_interval = sample_interval
+        self.peak_bytes = 0
+        self.live_blocks = 0
+        self.hotspots = []
+        self.samples = 0
+        self._was_tracing = False
+        self._baseline = {}
+        self._sampled = {}
+        self._start_bytes = 0
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def _line_usage(self, snapshot):
+        """Octets et blocs par ligne du projet (pas ceux de NumPy, de Tk ni de ce module)."""
+        filters = [
+            tracemalloc.Filter(True, os.path.join(PROJECT_DIR, "*")),
+            tracemalloc.Filter(False, __file__),
+        ]
+        return {(stat.traceback[0].filename, stat.traceback[0].lineno): (stat.size, stat.count)
+                for stat in snapshot.filter_traces(filters).statistics('lineno')}
+
+    def _add_sample(self):
+        for line, (size, count) in self._line_usage(tracemalloc.take_snapshot()).items():
+            base_size, base_count = self._baseline.get(line, (0, 0))
+            total_size, total_count = self._sampled.get(line, (0, 0))
+            self._sampled[line] = (total_size + max(size - base_size, 0), total_count + max(count - base_count, 0))
+        self.samples += 1
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            self._add_sample()
+
+    def __enter__(self):
+        self._was_tracing = tracemalloc.is_tracing()
+        if not self._was_tracing:
+            tracemalloc.start()
+        self._baseline = self._line_usage(tracemalloc.take_snapshot())
+        self._sampled = {}
+        self.samples = 0
+        tracemalloc.reset_peak()
+        self._start_bytes = tracemalloc.get_traced_memory()[0]
+
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        _, peak = tracemalloc.get_traced_memory()
+        self._stop.set()
+        self._sampler.join()
+        self._add_sample()  # Au moins un instantané, même pour une résolution très courte
+        after = self._line_usage(tracemalloc.take_snapshot())
+        if not self._was_tracing:
+            tracemalloc.stop()
+
+        self.peak_bytes = max(peak - self._start_bytes, 0)
+        self.live_blocks = sum(max(count - self._baseline.get(line, (0, 0))[1], 0) for line, (_, count) in after.items())
+
+        ranking = sorted(self._sampled.items(), key=lambda item: item[1][0], reverse=True)
+        self.hotspots = []
+        for (filename, lineno), (size, count) in ranking[:self.top]:
+            if size == 0:
+                break
+            self.hotspots.append((
+                _hotspot_label(filename, lineno),
+                f"{filename}:{lineno}",
+                size // self.samples,
+                count // self.samples,
+            ))
+        return False
+
+    def report(self):
+        """Résumé sous forme de dictionnaire (pour les résultats de benchmark)."""
+        return {
+            "peak_bytes": self.peak_bytes,
+            "live_blocks": self.live_blocks,
+            "hotspots": self.hotspots,
+            "samples": self.samples,
+        }
+
+    def summary(self):
+        """Texte court pour les labels des visualisations."""
+        return f"Mémoire (pic) : {self.peak_bytes / 1024:.1f} KB, {self.live_blocks} blocs restants"
+
+    def hotspot_lines(self, limit=3):
+        """Une ligne par point chaud, pour compléter summary() dans les labels."""
+        return [f"  {label} ({os.path.basename(location)}) : {size / 1024:.1f} KB, {count} blocs"
+                for label, location, size, count in self.hotspots[:limit]]
@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import signal
+import sys
+
+from budget import SolveBudget
+from main import solve_sudoku
+from plateau import CompactBoard
+
+# Recherche MRV reprenable : même parcours que solve_sudoku, mais l'état de la recherche
+# (grille, pile des points de choix, compteurs) est explicite au lieu de vivre dans la pile
+# d'appels Python. Il peut donc être sauvegardé sur disque (périodiquement ou sur signal)
+# puis repris dans un autre processus, ou partagé entre plusieurs machines.
+
+CHECKPOINT_VERSION = 1
+
+class SolverState:
+    """
+    État sérialisable de la recherche.
+    stack : un point de choix par niveau, [ligne, colonne, candidats (dans l'ordre), nombre essayés] ;
+    le dernier candidat essayé est celui qui est placé dans la grille.
+    expand : True si le prochain pas est l'ouverture d'un nouveau nœud.
+    """
+    __slots__ = ("board", "stack", "expand", "status", "nodes", "placements", "backtracks")
+
+    def __init__(self, board):
+        self.board = board if isinstance(board, CompactBoard) else CompactBoard.from_matrix(board)
+        self.stack = []
+        self.expand = True
+        self.status = "running"
+        self.nodes = 0
+        self.placements = 0
+        self.backtracks = 0
+
+    def to_dict(self):
+        return {
+            "version": CHECKPOINT_VERSION,
+            "board": self.board.to_string(),
+            "stack": self.stack,
+            "expand": self.expand,
+            "status": self.status,
+            "nodes": self.nodes,
+            "placements": self.placements,
+            "backtracks": self.backtracks,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError("Version de point de reprise inconnue")
+        state = cls(CompactBoard.from_string(data["board"]))
+        state.stack = [list(frame) for frame in data["stack"]]
+        state.expand = data["expand"]
+        # "interrupted" ne décrit que l'arrêt du processus précédent : la recherche reprend
+        state.status = "running" if data["status"] == "interrupted" else data["status"]
+        state.nodes = data["nodes"]
+        state.placements = data["placements"]
+        state.backtracks = data["backtracks"]
+        return state
+
+    def save(self, path):
+        """Écriture atomique : un fichier interrompu en cours d'écriture ne remplace jamais le précédent."""
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.to_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+class CheckpointRequest:
+    """Drapeaux positionnés par les signaux : SIGUSR1 sauvegarde et continue, SIGTERM sauvegarde et s'arrête."""
+    def __init__(self):
+        self.save = False
+        self.stop = False
+
+    def install(self):
+        signal.signal(signal.SIGTERM, self._on_stop)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self._on_save)
+
+    def _on_save(self, signum, frame):
+        self.save = True
+
+    def _on_stop(self, signum, frame):
+        self.save = True
+        self.stop = True
+
+def run(state, budget=None, checkpoint_path=None, checkpoint_every=None, request=None):
+    """
+    Fait avancer la recherche jusqu'à la fin ("solved" ou "unsolvable") ou jusqu'à un arrêt
+    demandé par signal ("interrupted"). Sauvegarde l'état tous les `checkpoint_every` nœuds et
+    à chaque demande. Renvoie le statut ; la grille de l'état contient la solution.
+    """
+    board = state.board
+    stack = state.stack
+    next_checkpoint = state.nodes + checkpoint_every if checkpoint_every else None
+
+    while state.status == "running":
+        if state.expand:
+            if budget is not None:
+                budget.tick()
+            state.nodes += 1
+            empty = board.most_constrained()
+            if empty is None:
+                state.status = "solved"
+                break
+            row, col = empty
+            stack.append([row, col, list(board.candidates(row, col)), 0])
+            state.expand = False
+
+        # Passe au candidat suivant du point de choix le plus profond, en remontant si besoin
+        while stack:
+            frame = stack[-1]
+            row, col, candidates, tried = frame
+            if tried > 0:
+                board[row, col] = 0  # Backtracking
+                state.backtracks += 1
+            if tried < len(candidates):
+                board[row, col] = candidates[tried]
+                frame[3] = tried + 1
+                state.placements += 1
+                state.expand = True
+                break
+            stack.pop()
+        else:
+            state.status = "unsolvable"
+            break
+
+        if checkpoint_path is not None:
+            periodic = next_checkpoint is not None and state.nodes >= next_checkpoint
+            if periodic or (request is not None and request.save):
+                state.save(checkpoint_path)
+                if periodic:
+                    next_checkpoint = state.nodes + checkpoint_every
+                if request is not None:
+                    request.save = False
+        if request is not None and request.stop:
+            state.status = "interrupted"
+            if checkpoint_path is not None:
+                state.save(checkpoint_path)
+            return "interrupted"
+
+    if checkpoint_path is not None:
+        state.save(checkpoint_path)
+    return state.status
+
+def split_state(state):
+    """
+    Partage le travail restant : la moitié des candidats non essayés du point de choix le moins
+    profond est retirée de `state` et confiée à un nouvel état (à reprendre ailleurs) ;
+    s'il ne reste qu'un candidat, il est confié entier.
+    Renvoie None s'il n'y a rien à partager.
+    """
+    for depth, (row, col, candidates, tried) in enumerate(state.stack):
+        remaining = candidates[tried:]
+        if not remaining:
+            continue
+        keep = len(remaining) // 2
+        stolen = remaining[keep:]
+        state.stack[depth][2] = candidates[:tried + keep]
+
+        # Nouvel état : même chemin jusqu'à ce niveau, sans alternative, puis les candidats confiés
+        board = state.board.copy()
+        for deeper_row, deeper_col, _, _ in state.stack[depth:]:
+            board[deeper_row, deeper_col] = 0
+        shared = SolverState(board)
+        shared.stack = [[r, c, [int(board[r, c])], 1] for r, c, _, _ in state.stack[:depth]]
+        shared.stack.append([row, col, stolen, 0])
+        shared.expand = False
+        return shared
+    return None
+
+def solve_resumable(board, budget=None, checkpoint_path=None, checkpoint_every=None, handle_signals=False):
+    """
+    Résout la grille (NumPy ou CompactBoard) avec sauvegardes. Renvoie (statut, état) ;
+    en cas de solution, la grille donnée est remplie sur place.
+    """
+    state = SolverState(board.copy())
+    request = CheckpointRequest() if handle_signals else None
+    if request is not None:
+        request.install()
+
+    status = run(state, budget, checkpoint_path, checkpoint_every, request)
+    if status == "solved":
+        if isinstance(board, CompactBoard):
+            board.cells[:] = state.board.cells
+        else:
+            board[:, :] = state.board.to_matrix()
+    return status, state
+
+class _StopAfter:
+    """Remplace le budget pour check_resume : demande l'arrêt (comme SIGTERM) après `nodes` nœuds."""
+    def __init__(self, request, nodes):
+        self.request = request
+        self.nodes = nodes
+        self.count = 0
+
+    def tick(self):
+        self.count += 1
+        if self.count >= self.nodes:
+            self.request.save = True
+            self.request.stop = True
+
+def check_resume(board, interrupt_after=500, checkpoint_path="reprise_verification.json"):
+    """
+    Vérifie la reprise : la recherche est arrêtée après `interrupt_after` nœuds comme par SIGTERM,
+    reprise depuis le fichier sauvegardé, puis comparée à solve_sudoku (nombre total de nœuds
+    et solution). Renvoie (concordance, nœuds de solve_sudoku, nœuds après reprise).
+    """
+    reference = CompactBoard.from_matrix(board) if not isinstance(board, CompactBoard) else board.copy()
+    budget = SolveBudget()
+    reference_status = "solved" if solve_sudoku(reference, budget) else "unsolvable"
+
+    request = CheckpointRequest()
+    state = SolverState(board.copy())
+    status = run(state, _StopAfter(request, interrupt_after), checkpoint_path, request=request)
+    if status == "interrupted":
+        state = SolverState.load(checkpoint_path)
+        status = run(state)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    same = status == reference_status and state.nodes == budget.nodes
+    if same and status == "solved":
+        same = state.board.to_string() == reference.to_string()
+    return same, budget.nodes, state.nodes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résolution longue durée avec points de reprise.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--puzzle", help="grille de 81 caractères ('.' ou '0' pour les cases vides)")
+    source.add_argument("--resume", action="store_true", help="reprend depuis le fichier de --checkpoint")
+    parser.add_argument("--checkpoint", default="reprise.json")
+    parser.add_argument("--every", type=int, default=100_000, help="nœuds entre deux sauvegardes")
+    parser.add_argument("--check", type=int, metavar="NŒUDS",
+                        help="avec --puzzle : interrompt après NŒUDS nœuds, reprend et compare à solve_sudoku")
+    args = parser.parse_args(argv)
+
+    if args.check is not None:
+        if args.puzzle is None:
+            parser.error("--check demande --puzzle")
+        same, expected_nodes, nodes = check_resume(CompactBoard.from_string(args.puzzle), args.check)
+        print(f"Reprise {'conforme' if same else 'NON CONFORME'} : {nodes} nœuds (solve_sudoku : {expected_nodes})")
+        return 0 if same else 1
+
+    state = SolverState.load(args.checkpoint) if args.resume else SolverState(CompactBoard.from_string(args.puzzle))
+    request = CheckpointRequest()
+    request.install()
+
+    status = run(state, checkpoint_path=args.checkpoint, checkpoint_every=args.every, request=request)
+    print(f"{status} après {state.nodes} nœuds ({state.backtracks} backtrackings)")
+    if status == "solved":
+        print(state.board.to_string())
+    return 0 if status in ("solved", "unsolvable") else 3
+
+if __name__ == "__main__":
+    sys.exit(main())
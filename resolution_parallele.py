@@ -0,0 +1,107 @@
+import multiprocessing as mp
+import os
+
+from main import count_solutions, find_most_constrained_location, get_valid_numbers, solve_sudoku
+from plateau import CompactBoard
+
+# Résolution parallèle d'une seule grille difficile : on développe les premiers niveaux
+# de l'arbre de recherche (toujours sur la case la plus contrainte) et on répartit les
+# sous-arbres obtenus entre plusieurs processus.
+
+def split_search_tree(board, split_depth=2):
+    """
+    Développe les `split_depth` premiers niveaux de branchement et renvoie la liste
+    des sous-grilles à explorer. Les branches sans candidat sont éliminées directement.
+    """
+    frontier = [board.copy()]
+
+    for _ in range(split_depth):
+        next_frontier = []
+        for sub_board in frontier:
+            empty = find_most_constrained_location(sub_board)
+            if not empty:
+                next_frontier.append(sub_board)  # Déjà résolue, rien à développer
+                continue
+            row, col = empty
+
+            for num in sorted(get_valid_numbers(sub_board, row, col)):
+                child = sub_board.copy()
+                child[row, col] = num
+                next_frontier.append(child)
+        frontier = next_frontier
+
+    return frontier
+
+def _solve_subtree(sub_board):
+    """Tâche d'un processus : résout un sous-arbre et renvoie la grille si elle est résolue."""
+    if solve_sudoku(sub_board):
+        return sub_board
+    return None
+
+def _count_subtree(task):
+    """Tâche d'un processus : compte les solutions d'un sous-arbre (au plus `limit`)."""
+    sub_board, limit = task
+    return count_solutions(sub_board, limit)
+
+def _next_result(results, budget):
+    """
+    Attend le résultat suivant d'un imap_unordered. Avec un budget, l'attente est
+    découpée pour vérifier régulièrement le délai et le jeton d'annulation
+    (BudgetExceeded est alors levée et le pool est arrêté en sortant du `with`).
+    """
+    if budget is None:
+        return results.next()
+    while True:
+        budget.check()
+        try:
+            return results.next(timeout=0.05)
+        except mp.TimeoutError:
+            pass
+
+def solve_sudoku_parallel(board, workers=None, split_depth=2, budget=None):
+    """
+    Résout la grille en explorant les sous-arbres en parallèle. Dès qu'un processus
+    trouve une solution, tous les autres sont arrêtés. La grille est remplie sur place,
+    comme avec solve_sudoku. Seuls le délai et l'annulation du budget sont appliqués
+    (la limite de nœuds ne concerne que les moteurs séquentiels).
+    """
+    subtrees = split_search_tree(board, split_depth)
+    if not subtrees:
+        return False
+
+    workers = workers or os.cpu_count() or 1
+    with mp.Pool(processes=min(workers, len(subtrees))) as pool:
+        results = pool.imap_unordered(_solve_subtree, subtrees)
+        for _ in subtrees:
+            solution = _next_result(results, budget)
+            if solution is not None:
+                pool.terminate()  # Annule les sous-arbres encore en cours
+                if isinstance(board, CompactBoard):
+                    board.cells[:] = solution.cells
+                else:
+                    board[:, :] = solution
+                return True
+
+    return False
+
+def count_solutions_parallel(board, limit=2, workers=None, split_depth=2, budget=None):
+    """
+    Compte les solutions (au plus `limit`) en additionnant les résultats des sous-arbres.
+    Les processus restants sont arrêtés dès que la limite est atteinte.
+    """
+    subtrees = split_search_tree(board, split_depth)
+    if not subtrees:
+        return 0
+
+    total = 0
+    workers = workers or os.cpu_count() or 1
+    with mp.Pool(processes=min(workers, len(subtrees))) as pool:
+        tasks = [(sub_board, limit) for sub_board in subtrees]
+        results = pool.imap_unordered(_count_subtree, tasks)
+        for _ in tasks:
+            total += _next_result(results, budget)
+            if total >= limit:
+                pool.terminate()
+                break
+
+    return min(total, limit)
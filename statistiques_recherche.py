@@ -0,0 +1,169 @@
+import argparse
+import sys
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from budget import solve_with_budget
+from garde_performance import DEFAULT_DATASETS, load_sample
+from main import ENGINES, string_to_matrix
+from trace_recherche import EVENT_BACKTRACK, EVENT_SELECT
+
+# Statistiques de recherche cumulées sur tout un jeu de grilles : nombre de fois où chaque case
+# sert de point de choix, nombre de retours en arrière par case, histogramme des profondeurs
+# des nœuds et nombre de nœuds par grille. Permet de voir où un moteur perd son temps sur
+# tout un niveau de difficulté, et pas seulement sur une grille.
+
+NUM_DEPTHS = 82  # Profondeur = nombre de cases placées par la recherche (0 à 81)
+
+class SearchStatistics:
+    """
+    Observateur à brancher comme `tracer` d'un moteur. Pendant une résolution, les compteurs
+    sont de simples listes Python (incrément bien moins coûteux qu'un accès NumPy) ; ils sont
+    ajoutés aux tableaux NumPy cumulés à chaque appel de end_puzzle().
+    """
+    __slots__ = ("branches", "backtracks", "depths", "nodes_per_puzzle",
+                 "_branches", "_backtracks", "_depths", "_depth", "_nodes")
+
+    def __init__(self):
+        self.branches = np.zeros(81, dtype=np.int64)
+        self.backtracks = np.zeros(81, dtype=np.int64)
+        self.depths = np.zeros(NUM_DEPTHS, dtype=np.int64)
+        self.nodes_per_puzzle = []
+        self._reset()
+
+    def _reset(self):
+        self._branches = [0] * 81
+        self._backtracks = [0] * 81
+        self._depths = [0] * NUM_DEPTHS
+        self._depth = 0
+        self._nodes = 0
+
+    def select(self, row, col):
+        self._branches[9 * row + col] += 1
+        self._depths[self._depth] += 1
+        self._nodes += 1
+
+    def place(self, row, col, value):
+        self._depth += 1
+
+    def propagate(self, row, col, value):
+        self._depth += 1
+
+    def backtrack(self, row, col, value):
+        self._backtracks[9 * row + col] += 1
+        self._depth -= 1
+
+    def solved(self):
+        pass
+
+    def end_puzzle(self):
+        """Ajoute les compteurs de la résolution qui vient de se terminer aux totaux."""
+        self.branches += np.array(self._branches, dtype=np.int64)
+        self.backtracks += np.array(self._backtracks, dtype=np.int64)
+        self.depths += np.array(self._depths, dtype=np.int64)
+        self.nodes_per_puzzle.append(self._nodes)
+        self._reset()
+
+    def add_trace(self, reader):
+        """Ajoute une trace enregistrée (TraceReader), entièrement en NumPy."""
+        records = reader.read_array()
+        events = records[:, 0] >> 4
+        selects = events == EVENT_SELECT
+        self.branches += np.bincount(records[selects, 1], minlength=81)
+        self.backtracks += np.bincount(records[events == EVENT_BACKTRACK, 1], minlength=81)
+        self.depths += np.bincount(records[selects, 2], minlength=NUM_DEPTHS)
+        self.nodes_per_puzzle.append(int(selects.sum()))
+
+    def merge(self, other):
+        self.branches += other.branches
+        self.backtracks += other.backtracks
+        self.depths += other.depths
+        self.nodes_per_puzzle.extend(other.nodes_per_puzzle)
+
+    def summary(self):
+        total_branches = int(self.branches.sum())
+        depth_values = np.arange(NUM_DEPTHS)
+        return {
+            "puzzles": len(self.nodes_per_puzzle),
+            "branches": total_branches,
+            "backtracks": int(self.backtracks.sum()),
+            "mean_depth": float((depth_values * self.depths).sum() / max(int(self.depths.sum()), 1)),
+            "max_depth": int(depth_values[self.depths > 0].max()) if self.depths.any() else 0,
+            "hottest_cell": divmod(int(self.backtracks.argmax()), 9),
+        }
+
+def collect_statistics(puzzles, levels, engine="mrv", time_limit=None):
+    """Résout chaque grille avec le moteur en observant la recherche. Renvoie {niveau: SearchStatistics}."""
+    statistics = {}
+    for sudoku_string, level in zip(puzzles, levels):
+        stats = statistics.setdefault(level, SearchStatistics())
+        solve_with_budget(string_to_matrix(sudoku_string), engine, time_limit=time_limit, tracer=stats)
+        stats.end_puzzle()
+    return statistics
+
+def plot_statistics(statistics, engine, output=None):
+    """Une ligne par niveau : carte des points de choix, carte des retours en arrière,
+    histogramme des profondeurs et distribution des nœuds par grille."""
+    fig, axes = plt.subplots(len(statistics), 4, figsize=(20, 4.5 * len(statistics)), squeeze=False)
+
+    for (level, stats), (ax_branches, ax_backtracks, ax_depths, ax_nodes) in zip(statistics.items(), axes):
+        for ax, values, title in ((ax_branches, stats.branches, "Points de choix par case"),
+                                  (ax_backtracks, stats.backtracks, "Retours en arrière par case")):
+            image = ax.imshow(values.reshape(9, 9), cmap="magma")
+            for i in range(1, 9):
+                lw = 2 if i % 3 == 0 else 0.5
+                ax.axhline(i - 0.5, color='white', lw=lw)
+                ax.axvline(i - 0.5, color='white', lw=lw)
+            ax.set_xticks([])
+            ax.set_yticks([])
+            ax.set_title(f"{level} - {title}")
+            fig.colorbar(image, ax=ax, fraction=0.046)
+
+        last_depth = int(np.flatnonzero(stats.depths).max()) + 1 if stats.depths.any() else 1
+        ax_depths.bar(np.arange(last_depth), stats.depths[:last_depth])
+        ax_depths.set_yscale("log")
+        ax_depths.set_title(f"{level} - Nœuds par profondeur")
+        ax_depths.set_xlabel("Profondeur (cases placées par la recherche)")
+
+        nodes = np.asarray(stats.nodes_per_puzzle)
+        if nodes.size:
+            ax_nodes.hist(nodes, bins=np.logspace(0, np.log10(max(nodes.max(), 1)) + 0.1, 40))
+        ax_nodes.set_xscale("log")
+        ax_nodes.set_title(f"{level} - Nœuds par grille")
+        ax_nodes.set_xlabel("Nœuds explorés")
+
+    fig.suptitle(f"Statistiques de recherche du moteur {engine}")
+    plt.tight_layout()
+    if output:
+        plt.savefig(output)
+    else:
+        plt.show()
+    plt.close(fig)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Statistiques de recherche cumulées par niveau de difficulté.")
+    parser.add_argument("--datasets", nargs="+", default=DEFAULT_DATASETS)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="mrv")
+    parser.add_argument("--sample-size", type=int, default=1000, help="grilles par fichier")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, help="délai maximal par grille (secondes)")
+    parser.add_argument("--output", help="enregistre les graphiques dans ce fichier au lieu de les afficher")
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args(argv)
+
+    puzzles, levels = load_sample(args.datasets, args.sample_size, args.seed)
+    statistics = collect_statistics(puzzles, levels, args.engine, args.time_limit)
+
+    for level, stats in statistics.items():
+        summary = stats.summary()
+        print(f"{level:10s} {summary['puzzles']:6d} grilles  {summary['branches']:10d} points de choix  "
+              f"{summary['backtracks']:10d} retours  profondeur moy. {summary['mean_depth']:.1f} "
+              f"(max {summary['max_depth']})  case la plus coûteuse {summary['hottest_cell']}")
+
+    if not args.no_plot:
+        plot_statistics(statistics, args.engine, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import json
+import sqlite3
+import time
+
+from budget import solve_batch
+from main import ENGINE_VERSION
+
+# Stockage persistant (SQLite) des grilles déjà résolues, pour ne pas les résoudre
+# à nouveau d'une exécution à l'autre. Clé : (grille, moteur) ; les résultats d'une
+# autre version des moteurs sont ignorés.
+
+DEFAULT_PATH = 'resultats.sqlite'
+BATCH_SIZE = 500  # Nombre de paramètres par requête (limite SQLite)
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_PATH, max_entries=1_000_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " puzzle TEXT NOT NULL,"
+            " engine TEXT NOT NULL,"
+            " engine_version TEXT NOT NULL,"
+            " solution TEXT,"
+            " stats TEXT NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (puzzle, engine))"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get_many(self, puzzles, engine="mrv"):
+        """
+        Cherche un lot de grilles. Renvoie {grille: {"solution", "stats"}} pour celles déjà
+        résolues par ce moteur dans la version courante, et marque ces entrées comme utilisées.
+        """
+        puzzles = list(dict.fromkeys(puzzles))
+        found = {}
+        for start in range(0, len(puzzles), BATCH_SIZE):
+            chunk = puzzles[start:start + BATCH_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT puzzle, solution, stats FROM results"
+                f" WHERE engine = ? AND engine_version = ? AND puzzle IN ({placeholders})",
+                [engine, ENGINE_VERSION, *chunk],
+            )
+            for puzzle, solution, stats in rows:
+                found[puzzle] = {"solution": solution, "stats": json.loads(stats)}
+
+        if found:
+            now = time.time()
+            self.connection.executemany(
+                "UPDATE results SET last_used = ? WHERE puzzle = ? AND engine = ?",
+                [(now, puzzle, engine) for puzzle in found],
+            )
+            self.connection.commit()
+        return found
+
+    def put_many(self, records, engine="mrv"):
+        """
+        Enregistre un lot de résultats : itérable de (grille, solution ou None, stats).
+        Les entrées les moins récemment utilisées sont supprimées au-delà de max_entries.
+        """
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO results (puzzle, engine, engine_version, solution, stats, last_used)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [(puzzle, engine, ENGINE_VERSION, solution, json.dumps(stats), now)
+             for puzzle, solution, stats in records],
+        )
+        self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        """Supprime les entrées les plus anciennes si la taille maximale est dépassée."""
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self.connection.execute(
+                "DELETE FROM results WHERE rowid IN"
+                " (SELECT rowid FROM results ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+def board_to_string(board):
+    return "".join(str(int(value)) for value in board.ravel())
+
+def solve_batch_with_store(sudoku_strings, store, engine="mrv", **budget_options):
+    """
+    Comme budget.solve_batch, mais les grilles déjà présentes dans le stockage ne sont
+    pas résolues. Renvoie {grille: {"solution", "stats"}} pour tout le lot ; seules les
+    grilles résolues ou prouvées sans solution sont enregistrées.
+    """
+    results = store.get_many(sudoku_strings, engine)
+    missing = [sudoku_string for sudoku_string in dict.fromkeys(sudoku_strings) if sudoku_string not in results]
+
+    new_records = []
+    for sudoku_string, (board, result) in zip(missing, solve_batch(missing, engine, **budget_options)):
+        stats = {key: value for key, value in result.items() if key in ("status", "engine", "nodes", "time")}
+        solution = board_to_string(board) if board is not None else None
+        results[sudoku_string] = {"solution": solution, "stats": stats}
+        # Une grille résolue par le moteur de secours est rangée sous le moteur demandé
+        # (stats["engine"] garde le moteur réellement utilisé)
+        if result["status"] in ("solved", "unsolvable"):
+            new_records.append((sudoku_string, solution, stats))
+
+    store.put_many(new_records, engine)
+    return results
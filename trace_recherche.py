@@ -0,0 +1,151 @@
+import struct
+
+import numpy as np
+
+from animation import FrameScheduler
+from main import ENGINES
+from plateau import CompactBoard
+
+# Enregistrement compact de la trace de recherche d'un moteur, pour l'analyser ou la
+# rejouer plus tard sans relancer la résolution.
+# Format : en-tête (magic, version, grille initiale sur 81 octets) puis 3 octets par événement :
+#   octet 0 : type d'événement (4 bits de poids fort) | valeur (4 bits de poids faible)
+#   octet 1 : index de la case (9 * ligne + colonne)
+#   octet 2 : profondeur (nombre de cases placées par la recherche)
+
+MAGIC = b"SDKTRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sB81s")
+RECORD_SIZE = 3
+FLUSH_SIZE = 1 << 16
+
+EVENT_PLACE = 0       # Une valeur est placée dans une case
+EVENT_BACKTRACK = 1   # La valeur est retirée (retour en arrière)
+EVENT_SELECT = 2      # Le moteur choisit la case à remplir
+EVENT_PROPAGATE = 3   # Une valeur est déduite par propagation (réservé : aucun moteur actuel ne propage)
+EVENT_SOLVED = 4      # Grille résolue
+
+EVENT_NAMES = {
+    EVENT_PLACE: "place",
+    EVENT_BACKTRACK: "backtrack",
+    EVENT_SELECT: "select",
+    EVENT_PROPAGATE: "propagate",
+    EVENT_SOLVED: "solved",
+}
+
+class TraceWriter:
+    """
+    Reçoit les événements d'un moteur (paramètre `tracer`) et les écrit par blocs.
+    La profondeur est suivie ici : +1 à chaque placement, -1 à chaque retour en arrière.
+    """
+    def __init__(self, path, initial_board):
+        self.path = path
+        self.file = open(path, "wb")
+        if isinstance(initial_board, CompactBoard):
+            cells = bytes(initial_board.cells)
+        else:
+            cells = bytes(int(value) for value in np.asarray(initial_board).ravel())
+        self.file.write(HEADER.pack(MAGIC, VERSION, cells))
+        self.buffer = bytearray()
+        self.depth = 0
+        self.events = 0
+
+    def _record(self, event, row, col, value):
+        self.buffer.extend((event << 4 | value, 9 * row + col, self.depth))
+        self.events += 1
+        if len(self.buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    def select(self, row, col):
+        self._record(EVENT_SELECT, row, col, 0)
+
+    def place(self, row, col, value):
+        self.depth += 1
+        self._record(EVENT_PLACE, row, col, value)
+
+    def propagate(self, row, col, value):
+        self.depth += 1
+        self._record(EVENT_PROPAGATE, row, col, value)
+
+    def backtrack(self, row, col, value):
+        self._record(EVENT_BACKTRACK, row, col, value)
+        self.depth -= 1
+
+    def solved(self):
+        self._record(EVENT_SOLVED, 0, 0, 0)
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class TraceReader:
+    """Relit une trace en flux : itérer donne des (événement, profondeur, ligne, colonne, valeur)."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, cells = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} n'est pas une trace de recherche")
+        self.initial_board = np.frombuffer(cells, dtype=np.uint8).reshape(9, 9).astype(np.int64)
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            f.seek(HEADER.size)
+            while True:
+                block = f.read(FLUSH_SIZE - FLUSH_SIZE % RECORD_SIZE)
+                if not block:
+                    break
+                for offset in range(0, len(block), RECORD_SIZE):
+                    kind, cell, depth = block[offset:offset + RECORD_SIZE]
+                    row, col = divmod(cell, 9)
+                    yield kind >> 4, depth, row, col, kind & 0x0F
+
+    def read_array(self):
+        """Toute la trace d'un coup, en tableau (M, 3) uint8 [type|valeur, case, profondeur], pour l'analyse."""
+        with open(self.path, "rb") as f:
+            f.seek(HEADER.size)
+            data = np.frombuffer(f.read(), dtype=np.uint8)
+        return data.reshape(-1, RECORD_SIZE)
+
+def record_solve(board, path, engine="mrv"):
+    """Résout la grille avec le moteur donné en enregistrant sa trace. Renvoie (résolue ?, nombre d'événements)."""
+    with TraceWriter(path, board) as tracer:
+        solved = ENGINES[engine](board, tracer=tracer)
+        if solved:
+            tracer.solved()
+    return solved, tracer.events
+
+def replay_in_viewer(viewer, reader):
+    """
+    Rejoue une trace dans une fenêtre de visualisation (classique ou avancée) sans relancer
+    le moteur. La vitesse suit le curseur de la fenêtre, la pause est respectée et l'affichage
+    est regroupé par images (voir animation.FrameScheduler).
+    """
+    board = reader.initial_board.copy()
+    viewer.sudoku_matrix = board
+    viewer.fixed_values = board != 0
+    scheduler = FrameScheduler(viewer, board)
+    attempts = backtracks = 0
+
+    for event, depth, row, col, value in reader:
+        if event in (EVENT_PLACE, EVENT_PROPAGATE):
+            board[row, col] = value
+            attempts += 1
+            scheduler.step(row, col, "blue", attempts=attempts)
+        elif event == EVENT_BACKTRACK:
+            board[row, col] = 0
+            backtracks += 1
+            scheduler.step(row, col, "red", backtracks=backtracks)
+
+    scheduler.finish()
+    viewer.update_grid(board)
@@ -0,0 +1,92 @@
+import numpy as np
+
+# Vérification vectorisée d'un grand nombre de solutions (tableau (N, 81)).
+# Chaque grille reçoit un code de statut ; 0 signifie que la solution est correcte.
+STATUS_OK = 0
+STATUS_INCOMPLETE = 1        # Case vide ou valeur hors de 1..9
+STATUS_RULE_VIOLATION = 2    # Doublon dans une ligne, une colonne ou une sous-grille
+STATUS_CLUE_MISMATCH = 3     # Un indice de la grille de départ a été modifié
+STATUS_REFERENCE_MISMATCH = 4  # Valide mais différente de la solution de référence
+
+STATUS_LABELS = {
+    STATUS_OK: "correcte",
+    STATUS_INCOMPLETE: "incomplète",
+    STATUS_RULE_VIOLATION: "règles non respectées",
+    STATUS_CLUE_MISMATCH: "indices modifiés",
+    STATUS_REFERENCE_MISMATCH: "différente de la correction",
+}
+
+FULL_MASK = 0b1111111110  # Bits 1 à 9 : chaque chiffre présent exactement une fois
+
+def strings_to_array(sudoku_strings):
+    """
+    Convertit une liste (ou une colonne pandas) de chaînes de 81 caractères en un
+    tableau (N, 81) de uint8, sans boucle Python par case. Les '.' deviennent des 0.
+    """
+    raw = np.frombuffer("".join(sudoku_strings).encode("ascii"), dtype=np.uint8).reshape(-1, 81)
+    grids = raw - ord('0')
+    grids[raw == ord('.')] = 0
+    return grids
+
+def _units_are_valid(grids):
+    """Renvoie un booléen par grille : toutes les lignes, colonnes et sous-grilles sont des permutations de 1..9."""
+    n = grids.shape[0]
+    bits = np.left_shift(np.uint16(1), grids.astype(np.uint16)).reshape(n, 9, 9)
+
+    rows = np.bitwise_or.reduce(bits, axis=2)
+    cols = np.bitwise_or.reduce(bits, axis=1)
+    boxes = np.bitwise_or.reduce(bits.reshape(n, 3, 3, 3, 3).transpose(0, 1, 3, 2, 4).reshape(n, 9, 9), axis=2)
+
+    # 9 valeurs dans 1..9 qui couvrent les 9 bits sont forcément toutes différentes
+    return (np.all(rows == FULL_MASK, axis=1)
+            & np.all(cols == FULL_MASK, axis=1)
+            & np.all(boxes == FULL_MASK, axis=1))
+
+def verify_solutions_bulk(solutions, puzzles, references=None):
+    """
+    Vérifie N solutions candidates d'un coup.
+
+    solutions, puzzles et references sont des tableaux (N, 81) (ou (N, 9, 9)).
+    Renvoie un vecteur de N codes de statut (voir STATUS_*). Le premier problème
+    détecté est retenu, dans l'ordre : incomplète, règles, indices, référence.
+    """
+    solutions = np.asarray(solutions).reshape(-1, 81)
+    puzzles = np.asarray(puzzles).reshape(-1, 81)
+    if solutions.shape != puzzles.shape:
+        raise ValueError("Les solutions et les grilles de départ n'ont pas la même taille")
+
+    status = np.full(solutions.shape[0], STATUS_OK, dtype=np.int8)
+
+    if references is not None:
+        references = np.asarray(references).reshape(-1, 81)
+        status[np.any(solutions != references, axis=1)] = STATUS_REFERENCE_MISMATCH
+
+    clues = puzzles != 0
+    status[np.any(clues & (solutions != puzzles), axis=1)] = STATUS_CLUE_MISMATCH
+
+    complete = np.all((solutions >= 1) & (solutions <= 9), axis=1)
+    valid = np.zeros_like(complete)
+    valid[complete] = _units_are_valid(solutions[complete])
+    status[complete & ~valid] = STATUS_RULE_VIOLATION
+    status[~complete] = STATUS_INCOMPLETE
+
+    return status
+
+def summarize_statuses(status):
+    """Compte le nombre de grilles pour chaque statut (pour l'affichage après un lot)."""
+    codes, counts = np.unique(status, return_counts=True)
+    return {STATUS_LABELS[int(code)]: int(count) for code, count in zip(codes, counts)}
+
+def verify_against_index(solutions, sudoku_strings, solution_index):
+    """
+    Comme verify_solutions_bulk, avec les solutions de référence retrouvées par contenu
+    dans un SolutionIndex (index_solutions.py) au lieu d'un appariement par position.
+    Les grilles absentes de l'index ne sont vérifiées que sur les règles et les indices.
+    """
+    solutions = np.asarray(solutions).reshape(-1, 81)
+    puzzles = strings_to_array(sudoku_strings)
+    references, found = solution_index.get_many(sudoku_strings)
+
+    status = verify_solutions_bulk(solutions, puzzles)
+    status[found] = verify_solutions_bulk(solutions[found], puzzles[found], references[found])
+    return status
@@ -1,26 +1,44 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from tkinter import Tk, Button, Label, OptionMenu, StringVar, Scale, HORIZONTAL, Frame
+from tkinter import Tk, Button, Checkbutton, BooleanVar, Label, OptionMenu, StringVar, Scale, HORIZONTAL, Frame
+from tkinter import filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import time
 import psutil
 import sys
+import os
+from collections import deque
+from contextlib import nullcontext
+
+from animation import FrameScheduler
+from graphe_contraintes import PEER_MATRIX
+from index_solutions import DEFAULT_PATH as SOLUTION_INDEX_PATH, SolutionIndex
+from profil_memoire import MemoryProfile
+from trace_recherche import TraceReader, replay_in_viewer
+
+# Index des solutions par contenu (voir index_solutions.py) : s'il existe, le fichier des réponses
+# n'est pas chargé et la correction est retrouvée à partir de la grille elle-même
+solution_index = SolutionIndex(SOLUTION_INDEX_PATH) if os.path.exists(SOLUTION_INDEX_PATH) else None
 
 # Charger les grilles avec et sans solutions depuis les fichiers CSV pour chaque niveau de difficulté
 grilles_facile_sans_rep = pd.read_csv('grilles_facile_sans_rep.csv')
-grilles_facile_avec_rep = pd.read_csv('grilles_facile_avec_rep.csv')
+grilles_facile_avec_rep = pd.read_csv('grilles_facile_avec_rep.csv') if solution_index is None else None
 
 # Fonction pour convertir une chaîne de caractères en matrice NumPy
 def string_to_matrix(sudoku_string):
     return np.array([int(char) if char != '.' else 0 for char in sudoku_string]).reshape(9, 9)
 
+# Nombre d'étapes gardées pour "Étape Précédente" (une grille complète par étape)
+HISTORY_LIMIT = 10_000
+
 # Classe qui gère la résolution de Sudoku avec ou sans visualisation
 class SudokuSolver:
     def __init__(self, board, viewer):
         self.board = board
         self.viewer = viewer
-        self.history = [np.copy(self.board)]  # Stocke l'historique des étapes, avec l'état initial
+        self.history = deque([np.copy(self.board)], maxlen=HISTORY_LIMIT)  # Stocke l'historique des étapes, avec l'état initial
+        self.scheduler = FrameScheduler(viewer, lambda: self.board)  # Affichage regroupé de la résolution détaillée
         self.attempt_counter = 0  # Initialisation du compteur de cases écrites ou générées
         self.backtrack_counter = 0  # Compteur du nombre de fois où le backtracking est appelé
         self.recursive_calls = 0  # Counter for recursive calls
@@ -37,11 +55,8 @@ class SudokuSolver:
             return set()
 
         possible_numbers = set(range(1, 10))
-        possible_numbers -= set(self.board[row, :])
-        possible_numbers -= set(self.board[:, col])
-
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        possible_numbers -= set(self.board[start_row:start_row + 3, start_col:start_col + 3].flatten())
+        # Valeurs des 20 voisins de la case, lues grâce au graphe de contraintes
+        possible_numbers -= set(self.board.ravel()[PEER_MATRIX[9 * row + col]].tolist())
 
         return possible_numbers
 
@@ -83,48 +98,30 @@ class SudokuSolver:
         row, col = empty
 
         self.viewer.highlight_cell(row, col)
-        self.viewer.root.update()
 
         for num in self.get_valid_numbers(row, col):
-            if self.viewer.paused:
-                while self.viewer.paused and not self.viewer.step_forward:
-                    self.viewer.root.update()
-                    time.sleep(0.1)
-
             self.history.append(np.copy(self.board))
 
             self.board[row][col] = num
             self.attempt_counter += 1  # Incrémentation du compteur de cases écrites ou générées
-            self.viewer.update_attempt_counter(self.attempt_counter)
-            self.viewer.update_grid(self.board, row, col, color="blue")
-            self.viewer.root.update()
+
+            # Le délai du curseur et la pause sont gérés par l'ordonnanceur d'affichage
+            self.scheduler.step(row, col, "blue", attempts=self.attempt_counter)
 
             if self.viewer.step_forward:
                 self.viewer.step_forward = False
                 self.current_depth -= 1
                 return False
 
-            time.sleep(self.viewer.speed_scale.get() / 1000)
-
             if self.solve_sudoku_detailed():
                 self.current_depth -= 1
                 return True
 
-            self.viewer.update_grid(self.board, row, col, color="red")
-            self.viewer.root.update()
-
-            time.sleep(self.viewer.speed_scale.get() / 1000)
-
             self.history.append(np.copy(self.board))
 
             self.board[row][col] = 0
-            self.viewer.update_grid(self.board)
-            self.viewer.root.update()
-
             self.backtrack_counter += 1  # Incrémentation du compteur de backtracking
-            self.viewer.update_backtrack_counter(self.backtrack_counter)
-
-            time.sleep(self.viewer.speed_scale.get() / 1000)
+            self.scheduler.step(row, col, "red", backtracks=self.backtrack_counter)
 
         self.current_depth -= 1
         return False
@@ -204,6 +201,7 @@ class SudokuViewer:
         self.paused = False
         self.step_forward = False
         self.solver = None
+        self.delay_divisor = 1000  # Curseur de vitesse en millisecondes par pas
 
         sudoku_string = self.grilles_sans_rep['puzzle'].iloc[self.index]
         self.sudoku_matrix = string_to_matrix(sudoku_string)
@@ -225,6 +223,11 @@ class SudokuViewer:
         self.speed_scale.set(300)
         self.speed_scale.pack(side="left", expand=True, fill="x", padx=5)
 
+        # Vitesse maximale : le solveur ne dort plus, la grille est redessinée à fréquence fixe
+        self.max_speed_var = BooleanVar(self.root, value=False)
+        self.max_speed_check = Checkbutton(control_frame_top, text="Vitesse maximale", variable=self.max_speed_var)
+        self.max_speed_check.pack(side="left", padx=5)
+
         # Pause button (pack on the right side)
         self.pause_button = Button(control_frame_top, text="Pause", command=self.pause_solver)
         self.pause_button.pack(side="left", padx=5)
@@ -272,6 +275,14 @@ class SudokuViewer:
         self.solve_detailed_button = Button(control_frame_bottom, text="Résolution Détaillée", command=self.solve_detailed)
         self.solve_detailed_button.pack(pady=5)
 
+        # Profil mémoire (tracemalloc) : plus précis que le RSS mais ralentit la résolution
+        self.profile_memory_var = BooleanVar(self.root, value=False)
+        self.profile_memory_check = Checkbutton(control_frame_bottom, text="Profil mémoire", variable=self.profile_memory_var)
+        self.profile_memory_check.pack(pady=5)
+
+        self.replay_button = Button(control_frame_bottom, text="Rejouer une trace", command=self.replay_trace)
+        self.replay_button.pack(pady=5)
+
         self.verification_label = Label(self.root, text="", fg="blue")
         self.verification_label.pack()
 
@@ -291,6 +302,9 @@ class SudokuViewer:
         self.recursive_calls_label = Label(self.root, text="Appels récursifs : 0", fg="black")
         self.recursive_calls_label.pack(side="right", padx=5)
 
+        self.steps_per_second_label = Label(self.root, text="Pas/s : 0", fg="black")
+        self.steps_per_second_label.pack(side="right", padx=5)
+
         self.display_sudoku()
 
     
@@ -309,6 +323,14 @@ class SudokuViewer:
         if self.solver:
             self.solver.undo_step()
 
+    def replay_trace(self):
+        """Rejoue une trace enregistrée (trace_recherche.py) sans relancer le solveur."""
+        path = filedialog.askopenfilename(title="Trace de recherche", filetypes=[("Trace", "*.trace"), ("Tous les fichiers", "*")])
+        if path:
+            self.paused = False
+            self.verification_label.config(text="")
+            replay_in_viewer(self, TraceReader(path))
+
     def update_level(self, selected_level):
         self.index = 0
         self.level = selected_level
@@ -377,8 +399,11 @@ class SudokuViewer:
     def solve_current_sudoku(self):
         start_time = time.time()  # Start the timer
         self.solver = SudokuSolver(self.sudoku_matrix, self)
-        
-        if self.solver.solve_sudoku():
+        memory_profile = MemoryProfile() if self.profile_memory_var.get() else nullcontext()
+        with memory_profile:
+            success = self.solver.solve_sudoku()
+
+        if success:
             print("Sudoku résolu avec succès !")
             self.verify_solution()
             self.animate_solution_success()  # Animation après la résolution
@@ -392,8 +417,7 @@ class SudokuViewer:
         self.execution_time_label.config(text=f"Temps d'exécution : {execution_time:.4f}s")
         
         # Memory usage
-        self.solver.calculate_memory_usage()
-        self.memory_usage_label.config(text=f"Memory usage : {self.solver.memory_usage:.2f} MB")
+        self.update_memory_label(memory_profile)
         
         # Recursive calls
         self.recursive_calls_label.config(text=f"Appels récursifs : {self.solver.recursive_calls}")
@@ -401,8 +425,12 @@ class SudokuViewer:
     def solve_detailed(self):
         start_time = time.time()  # Start the timer
         self.solver = SudokuSolver(self.sudoku_matrix, self)
-        
-        if self.solver.solve_sudoku_detailed():
+        memory_profile = MemoryProfile() if self.profile_memory_var.get() else nullcontext()
+        with memory_profile:
+            success = self.solver.solve_sudoku_detailed()
+        self.solver.scheduler.finish()
+
+        if success:
             print("Sudoku résolu avec succès !")
             self.verify_solution()
             self.animate_solution_success()  # Animation après la résolution
@@ -415,12 +443,26 @@ class SudokuViewer:
         self.execution_time_label.config(text=f"Temps d'exécution : {execution_time:.4f}s")
         
         # Memory usage
-        self.solver.calculate_memory_usage()
-        self.memory_usage_label.config(text=f"Memory usage : {self.solver.memory_usage:.2f} MB")
+        self.update_memory_label(memory_profile, includes_rendering=True)
         
         # Recursive calls
         self.recursive_calls_label.config(text=f"Appels récursifs : {self.solver.recursive_calls}")
 
+    def update_memory_label(self, memory_profile, includes_rendering=False):
+        """
+        Affiche le profil tracemalloc s'il est activé, sinon le RSS du processus.
+        includes_rendering : le profil couvre aussi les mises à jour de l'affichage (résolution détaillée).
+        """
+        if isinstance(memory_profile, MemoryProfile):
+            text = memory_profile.summary()
+            if includes_rendering:
+                text += " (affichage compris)"
+            text = "\n".join([text, *memory_profile.hotspot_lines()])
+            self.memory_usage_label.config(text=text, justify="left")
+        else:
+            self.solver.calculate_memory_usage()
+            self.memory_usage_label.config(text=f"Memory usage : {self.solver.memory_usage:.2f} MB")
+
     def animate_solution_success(self):
         """Illumine toute la grille en vert pour indiquer que la solution est correcte."""
         self.update_grid(self.sudoku_matrix, color="green")
@@ -430,7 +472,15 @@ class SudokuViewer:
         self.root.after(1000, lambda: self.update_grid(self.sudoku_matrix))
 
     def verify_solution(self):
-        correct_solution = string_to_matrix(self.grilles_avec_rep['solution'].iloc[self.index])
+        if solution_index is not None:
+            solution_string = solution_index.get(self.grilles_sans_rep['puzzle'].iloc[self.index])
+        else:
+            solution_string = self.grilles_avec_rep['solution'].iloc[self.index]
+        if solution_string is None:
+            self.verification_label.config(text="Aucune correction pour cette grille", fg="orange")
+            return
+
+        correct_solution = string_to_matrix(solution_string)
         if np.array_equal(self.sudoku_matrix, correct_solution):
             self.verification_label.config(text="Correspond bien à la correction", fg="green")
         else:
@@ -1,19 +1,36 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from tkinter import Tk, Button, Label, Scale, HORIZONTAL, Frame
+from tkinter import Tk, Button, Checkbutton, BooleanVar, Label, Scale, HORIZONTAL, Frame
+from tkinter import filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import time
 import psutil
+import os
+from collections import deque
+from contextlib import nullcontext
+
+from animation import FrameScheduler
+from graphe_contraintes import PEER_MATRIX
+from index_solutions import DEFAULT_PATH as SOLUTION_INDEX_PATH, SolutionIndex
+from profil_memoire import MemoryProfile
+from trace_recherche import TraceReader, replay_in_viewer
+
+# Index des solutions par contenu (voir index_solutions.py) : s'il existe, le fichier des réponses
+# n'est pas chargé et la correction est retrouvée à partir de la grille elle-même
+solution_index = SolutionIndex(SOLUTION_INDEX_PATH) if os.path.exists(SOLUTION_INDEX_PATH) else None
 
 # Charger les grilles avec et sans solutions depuis les fichiers CSV pour chaque niveau de difficulté
 grilles_facile_sans_rep = pd.read_csv('grilles_facile_sans_rep.csv')
-grilles_facile_avec_rep = pd.read_csv('grilles_facile_avec_rep.csv')
+grilles_facile_avec_rep = pd.read_csv('grilles_facile_avec_rep.csv') if solution_index is None else None
 
 # Fonction pour convertir une chaîne de caractères en matrice NumPy
 def string_to_matrix(sudoku_string):
     return np.array([int(char) if char != '.' else 0 for char in sudoku_string]).reshape(9, 9)
 
+# Nombre d'étapes gardées pour "Étape Précédente" (une grille complète par étape)
+HISTORY_LIMIT = 10_000
+
 # Simple Classical Backtracking Solver (with optimizations for step-by-step visualization)
 class ClassicBacktrackingSolver:
     def __init__(self, board, viewer):
@@ -22,13 +39,12 @@ class ClassicBacktrackingSolver:
         self.attempt_counter = 0
         self.backtrack_counter = 0
         self.recursive_calls = 0
-        self.history = [np.copy(board)]  # Historique pour les étapes précédentes
+        self.history = deque([np.copy(board)], maxlen=HISTORY_LIMIT)  # Historique pour les étapes précédentes
+        self.scheduler = FrameScheduler(viewer, lambda: self.board)
 
     def is_safe(self, row, col, num):
-        for i in range(9):
-            if self.board[row][i] == num or self.board[i][col] == num or self.board[3 * (row // 3) + i // 3][3 * (col // 3) + i % 3] == num:
-                return False
-        return True
+        # Valeurs des 20 voisins de la case, lues grâce au graphe de contraintes
+        return num not in self.board.ravel()[PEER_MATRIX[9 * row + col]].tolist()
 
     def find_empty_location(self):
         for i in range(9):
@@ -38,7 +54,7 @@ class ClassicBacktrackingSolver:
         return None
 
     def solve_classic_step_by_step(self):
-        """Résout la grille avec visualisation, pas à pas."""
+        """Résout la grille avec visualisation, pas à pas (affichage regroupé par images)."""
         empty = self.find_empty_location()
         if not empty:
             return True
@@ -50,34 +66,24 @@ class ClassicBacktrackingSolver:
             if self.is_safe(row, col, num):
                 self.board[row][col] = num
                 self.attempt_counter += 1
-                self.viewer.update_attempt_counter(self.attempt_counter)
-                self.viewer.update_grid(self.board, row, col, color="blue")
-                self.viewer.root.update()
 
                 # Stocker l'état de la grille dans l'historique pour "Étape Précédente"
                 self.history.append(np.copy(self.board))
 
-                if self.viewer.paused:
-                    while self.viewer.paused and not self.viewer.step_forward:
-                        self.viewer.root.update()
-                        time.sleep(0.1)
+                # Le délai du curseur et la pause sont gérés par l'ordonnanceur d'affichage
+                self.scheduler.step(row, col, "blue", attempts=self.attempt_counter)
 
                 if self.viewer.step_forward:
                     self.viewer.step_forward = False
                     return False
 
-                # Réduction de la vitesse pour une meilleure visualisation
-                time.sleep(self.viewer.speed_scale.get() / 10000)
-
                 if self.solve_classic_step_by_step():
                     return True
 
                 # Backtracking
-                self.viewer.update_grid(self.board, row, col, color="red")
                 self.board[row][col] = 0
                 self.backtrack_counter += 1
-                self.viewer.update_backtrack_counter(self.backtrack_counter)
-                time.sleep(self.viewer.speed_scale.get() / 10000)
+                self.scheduler.step(row, col, "red", backtracks=self.backtrack_counter)
 
         return False
 
@@ -125,6 +131,7 @@ class SudokuViewer:
         self.paused = False
         self.step_forward = False
         self.solver = None
+        self.delay_divisor = 10000  # Curseur de vitesse en dixièmes de milliseconde par pas
 
         sudoku_string = self.grilles_sans_rep['puzzle'].iloc[self.index]
         self.sudoku_matrix = string_to_matrix(sudoku_string)
@@ -144,6 +151,11 @@ class SudokuViewer:
         self.speed_scale.set(300)
         self.speed_scale.pack(side="left", expand=True, fill="x", padx=5)
 
+        # Vitesse maximale : le solveur ne dort plus, la grille est redessinée à fréquence fixe
+        self.max_speed_var = BooleanVar(self.root, value=False)
+        self.max_speed_check = Checkbutton(control_frame_top, text="Vitesse maximale", variable=self.max_speed_var)
+        self.max_speed_check.pack(side="left", padx=5)
+
         self.pause_button = Button(control_frame_top, text="Pause", command=self.pause_solver)
         self.pause_button.pack(side="left", padx=5)
 
@@ -177,6 +189,14 @@ class SudokuViewer:
         self.solve_detailed_button = Button(control_frame_bottom, text="Résolution Détaillée", command=self.solve_detailed)
         self.solve_detailed_button.pack(pady=5)
 
+        # Profil mémoire (tracemalloc) : plus précis que le RSS mais ralentit la résolution
+        self.profile_memory_var = BooleanVar(self.root, value=False)
+        self.profile_memory_check = Checkbutton(control_frame_bottom, text="Profil mémoire", variable=self.profile_memory_var)
+        self.profile_memory_check.pack(pady=5)
+
+        self.replay_button = Button(control_frame_bottom, text="Rejouer une trace", command=self.replay_trace)
+        self.replay_button.pack(pady=5)
+
         self.verification_label = Label(self.root, text="", fg="blue")
         self.verification_label.pack()
 
@@ -196,6 +216,9 @@ class SudokuViewer:
         self.recursive_calls_label = Label(self.root, text="Appels récursifs : 0", fg="black")
         self.recursive_calls_label.pack(side="right", padx=5)
 
+        self.steps_per_second_label = Label(self.root, text="Pas/s : 0", fg="black")
+        self.steps_per_second_label.pack(side="right", padx=5)
+
         self.display_sudoku()
 
     def pause_solver(self):
@@ -213,6 +236,14 @@ class SudokuViewer:
         if self.solver:
             self.solver.undo_step()
 
+    def replay_trace(self):
+        """Rejoue une trace enregistrée (trace_recherche.py) sans relancer le solveur."""
+        path = filedialog.askopenfilename(title="Trace de recherche", filetypes=[("Trace", "*.trace"), ("Tous les fichiers", "*")])
+        if path:
+            self.paused = False
+            self.verification_label.config(text="")
+            replay_in_viewer(self, TraceReader(path))
+
     def display_sudoku(self, color=None):
         """Affiche la grille de Sudoku actuelle."""
         for widget in self.canvas_frame.winfo_children():
@@ -263,7 +294,9 @@ class SudokuViewer:
         start_time = time.time()
 
         self.solver = ClassicBacktrackingSolver(self.sudoku_matrix, self)
-        success = self.solver.solve_classic()
+        memory_profile = MemoryProfile() if self.profile_memory_var.get() else nullcontext()
+        with memory_profile:
+            success = self.solver.solve_classic()
 
         if success:
             self.verify_solution()
@@ -275,10 +308,7 @@ class SudokuViewer:
         execution_time = time.time() - start_time
         self.execution_time_label.config(text=f"Temps d'exécution : {execution_time:.4f}s")
 
-        # Memory usage
-        process = psutil.Process()
-        memory_usage = process.memory_info().rss / 1024 ** 2
-        self.memory_usage_label.config(text=f"Memory usage : {memory_usage:.2f} MB")
+        self.update_memory_label(memory_profile)
 
         self.recursive_calls_label.config(text=f"Appels récursifs : {self.solver.recursive_calls}")
 
@@ -286,7 +316,10 @@ class SudokuViewer:
         start_time = time.time()
 
         self.solver = ClassicBacktrackingSolver(self.sudoku_matrix, self)
-        success = self.solver.solve_classic_step_by_step()
+        memory_profile = MemoryProfile() if self.profile_memory_var.get() else nullcontext()
+        with memory_profile:
+            success = self.solver.solve_classic_step_by_step()
+        self.solver.scheduler.finish()
 
         if success:
             self.verify_solution()
@@ -297,13 +330,26 @@ class SudokuViewer:
         execution_time = time.time() - start_time
         self.execution_time_label.config(text=f"Temps d'exécution : {execution_time:.4f}s")
 
-        # Memory usage
-        process = psutil.Process()
-        memory_usage = process.memory_info().rss / 1024 ** 2
-        self.memory_usage_label.config(text=f"Memory usage : {memory_usage:.2f} MB")
+        self.update_memory_label(memory_profile, includes_rendering=True)
 
         self.recursive_calls_label.config(text=f"Appels récursifs : {self.solver.recursive_calls}")
 
+    def update_memory_label(self, memory_profile, includes_rendering=False):
+        """
+        Affiche le profil tracemalloc s'il est activé, sinon le RSS du processus.
+        includes_rendering : le profil couvre aussi les mises à jour de l'affichage (résolution détaillée).
+        """
+        if isinstance(memory_profile, MemoryProfile):
+            text = memory_profile.summary()
+            if includes_rendering:
+                text += " (affichage compris)"
+            text = "\n".join([text, *memory_profile.hotspot_lines()])
+            self.memory_usage_label.config(text=text, justify="left")
+        else:
+            process = psutil.Process()
+            memory_usage = process.memory_info().rss / 1024 ** 2
+            self.memory_usage_label.config(text=f"Memory usage : {memory_usage:.2f} MB")
+
     def animate_solution_success(self):
         """Illumine toute la grille en vert pour indiquer que la solution est correcte."""
         self.update_grid(self.sudoku_matrix, color="green")
@@ -312,7 +358,15 @@ class SudokuViewer:
         self.root.after(1000, lambda: self.update_grid(self.sudoku_matrix))
 
     def verify_solution(self):
-        correct_solution = string_to_matrix(self.grilles_avec_rep['solution'].iloc[self.index])
+        if solution_index is not None:
+            solution_string = solution_index.get(self.grilles_sans_rep['puzzle'].iloc[self.index])
+        else:
+            solution_string = self.grilles_avec_rep['solution'].iloc[self.index]
+        if solution_string is None:
+            self.verification_label.config(text="Aucune correction pour cette grille", fg="orange")
+            return
+
+        correct_solution = string_to_matrix(solution_string)
         if np.array_equal(self.sudoku_matrix, correct_solution):
             self.verification_label.config(text="Correspond bien à la correction", fg="green")
         else: